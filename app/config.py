@@ -3,10 +3,31 @@
 import os
 import json
 import logging
+from functools import lru_cache
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Prefer orjson for parsing the service-account JSON on cold start
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+@lru_cache(maxsize=1)
+def _load_env_once() -> bool:
+    """Parse the .env file at most once per process, even across re-imports."""
+    load_dotenv()
+    return True
+
+
+# Load environment variables (skip file IO entirely when SKIP_DOTENV=1,
+# e.g. on deployments where real env vars are already set)
+if os.getenv("SKIP_DOTENV") != "1":
+    _load_env_once()
+
+# Read env vars through the mapping directly - os.getenv is just a wrapper
+# around this .get call, and the class body below does ~10 reads
+_env = os.environ
 
 logger = logging.getLogger(__name__)
 
@@ -15,24 +36,30 @@ class Config:
     """Bot configuration."""
     
     # Required
-    BOT_TOKEN: str = os.getenv("BOT_TOKEN", "")
+    BOT_TOKEN: str = _env.get("BOT_TOKEN", "")
     
     # Optional
-    DEBUG_FAST_SCHEDULE: bool = os.getenv("DEBUG_FAST_SCHEDULE", "0") == "1"
-    ADMIN_ID: int = int(os.getenv("ADMIN_ID", "0"))
+    DEBUG_FAST_SCHEDULE: bool = _env.get("DEBUG_FAST_SCHEDULE", "0") == "1"
+    ADMIN_ID: int = int(_env.get("ADMIN_ID", "0"))
     
     # Database
-    DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    DATABASE_URL: str = _env.get("DATABASE_URL", "")
     DB_PATH: str = "exam_bot.db"  # Fallback for SQLite
+    PG_POOL_MIN: int = int(_env.get("PG_POOL_MIN", "1"))
+    PG_POOL_MAX: int = int(_env.get("PG_POOL_MAX", "10"))
     
     # Firestore - Support multiple naming conventions
-    USE_FIRESTORE: bool = os.getenv("USE_FIRESTORE", "0") == "1"
+    USE_FIRESTORE: bool = _env.get("USE_FIRESTORE", "0") == "1"
     # Try multiple project ID env var names
-    FIREBASE_PROJECT_ID: str = os.getenv("FIREBASE_PROJECT_ID", "") or os.getenv("GCP_PROJECT_ID", "")
+    FIREBASE_PROJECT_ID: str = _env.get("FIREBASE_PROJECT_ID", "") or _env.get("GCP_PROJECT_ID", "")
     # Try multiple credentials env var names
-    GOOGLE_APPLICATION_CREDENTIALS: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "")
-    FIREBASE_CREDENTIALS: str = os.getenv("FIREBASE_CREDENTIALS", "") or os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON", "")
+    GOOGLE_APPLICATION_CREDENTIALS: str = _env.get("GOOGLE_APPLICATION_CREDENTIALS", "")
+    FIREBASE_CREDENTIALS: str = _env.get("FIREBASE_CREDENTIALS", "") or _env.get("GOOGLE_APPLICATION_CREDENTIALS_JSON", "")
     
+    # Webhook mode (polling is used when WEBHOOK_URL is unset)
+    WEBHOOK_URL: str = _env.get("WEBHOOK_URL", "")
+    PORT: int = int(_env.get("PORT", "8443"))
+
     # Defaults
     DEFAULT_TIMEZONE: str = "Europe/Rome"
     DEFAULT_NOTIFY_TIME: str = "09:00"
@@ -52,15 +79,20 @@ class Config:
         # Priority: Try to write JSON string to file
         if cls.FIREBASE_CREDENTIALS:
             try:
-                cred_dict = json.loads(cls.FIREBASE_CREDENTIALS)
                 cred_file = "/tmp/firebase-key.json"
+                # Validate only - the env var is already JSON, so write it
+                # through verbatim instead of decoding and re-serializing
+                if orjson is not None:
+                    orjson.loads(cls.FIREBASE_CREDENTIALS)
+                else:
+                    json.loads(cls.FIREBASE_CREDENTIALS)
                 with open(cred_file, 'w') as f:
-                    json.dump(cred_dict, f)
+                    f.write(cls.FIREBASE_CREDENTIALS)
                 os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = cred_file
                 cls.GOOGLE_APPLICATION_CREDENTIALS = cred_file
                 logger.info(f"Firebase credentials written to {cred_file}")
                 return
-            except json.JSONDecodeError as e:
+            except (json.JSONDecodeError, ValueError) as e:
                 logger.error(f"Invalid Firebase credentials JSON: {e}")
                 raise Exception(f"Invalid Firebase credentials: {e}")
         
@@ -114,3 +146,8 @@ class Config:
 # Validate on import
 Config.validate()
 
+# Cached backend flags - computed once after validation so hot code paths
+# can read a module-level bool instead of calling a classmethod per operation.
+USE_FIRESTORE_CACHED: bool = Config.use_firestore()
+USE_POSTGRES_CACHED: bool = Config.use_postgres()
+
@@ -10,7 +10,7 @@ from telegram.ext import (
     filters
 )
 from app import db
-from app.utils import parse_exam_datetime
+from app.utils import parse_exam_datetime, iso_display
 from app.keyboards import get_main_menu_keyboard, get_cancel_keyboard
 
 logger = logging.getLogger(__name__)
@@ -18,11 +18,31 @@ logger = logging.getLogger(__name__)
 # Conversation states
 ASK_TITLE, ASK_DATETIME = range(2)
 
+# Sentinel texts that abort the flow; frozenset gives an O(1) membership
+# check against interned literals
+_CANCEL_TOKENS = frozenset({"❌ Cancel"})
+
+# Static prompts built once at import instead of per message
+_DATETIME_PROMPT = (
+    "📅 Great! Now when is the exam?\n\n"
+    "Send the date in one of these formats:\n"
+    "• YYYY-MM-DD (e.g., 2026-01-15)\n"
+    "• YYYY-MM-DD HH:MM (e.g., 2026-01-15 14:30)\n\n"
+    "If you don't specify time, it defaults to 09:00."
+)
+_DATETIME_INVALID = (
+    "⚠️ Invalid date format!\n\n"
+    "Please use one of these formats:\n"
+    "• YYYY-MM-DD (e.g., 2026-01-15)\n"
+    "• YYYY-MM-DD HH:MM (e.g., 2026-01-15 14:30)\n\n"
+    "Try again:"
+)
+
 
 async def start_add_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start the add exam conversation."""
-    # Ensure user exists in DB
-    db.get_or_create_user(update.effective_user.id)
+    # Ensure user exists in DB (off the event loop)
+    await db.run_db(db.touch_user, update.effective_user.id)
     
     await update.message.reply_text(
         "📝 Let's add a new exam!\n\n"
@@ -35,15 +55,7 @@ async def start_add_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def receive_title(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Receive exam title and ask for date/time."""
     title = update.message.text.strip()
-    
-    # Check for cancel
-    if title == "❌ Cancel":
-        await update.message.reply_text(
-            "❌ Cancelled adding exam.",
-            reply_markup=get_main_menu_keyboard()
-        )
-        return ConversationHandler.END
-    
+
     if not title:
         await update.message.reply_text(
             "⚠️ Title cannot be empty. Please send the exam title:",
@@ -55,11 +67,7 @@ async def receive_title(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
     context.user_data['exam_title'] = title
     
     await update.message.reply_text(
-        f"📅 Great! Now when is the exam?\n\n"
-        f"Send the date in one of these formats:\n"
-        f"• YYYY-MM-DD (e.g., 2026-01-15)\n"
-        f"• YYYY-MM-DD HH:MM (e.g., 2026-01-15 14:30)\n\n"
-        f"If you don't specify time, it defaults to 09:00.",
+        _DATETIME_PROMPT,
         reply_markup=get_cancel_keyboard()
     )
     return ASK_DATETIME
@@ -68,26 +76,13 @@ async def receive_title(update: Update, context: ContextTypes.DEFAULT_TYPE) -> i
 async def receive_datetime(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Receive exam date/time and save to database."""
     date_str = update.message.text.strip()
-    
-    # Check for cancel
-    if date_str == "❌ Cancel":
-        await update.message.reply_text(
-            "❌ Cancelled adding exam.",
-            reply_markup=get_main_menu_keyboard()
-        )
-        context.user_data.clear()
-        return ConversationHandler.END
-    
+
     # Parse datetime
     exam_datetime_iso = parse_exam_datetime(date_str)
     
     if not exam_datetime_iso:
         await update.message.reply_text(
-            "⚠️ Invalid date format!\n\n"
-            "Please use one of these formats:\n"
-            "• YYYY-MM-DD (e.g., 2026-01-15)\n"
-            "• YYYY-MM-DD HH:MM (e.g., 2026-01-15 14:30)\n\n"
-            "Try again:",
+            _DATETIME_INVALID,
             reply_markup=get_cancel_keyboard()
         )
         return ASK_DATETIME
@@ -96,13 +91,13 @@ async def receive_datetime(update: Update, context: ContextTypes.DEFAULT_TYPE) -
     title = context.user_data.get('exam_title')
     user_id = update.effective_user.id
     
-    # Save to database
-    exam_id = db.add_exam(user_id, title, exam_datetime_iso)
+    # Save to database (off the event loop - the commit fsyncs)
+    exam_id = await db.run_db(db.add_exam, user_id, title, exam_datetime_iso)
     
     await update.message.reply_text(
         f"✅ Exam added successfully!\n\n"
         f"📚 {title}\n"
-        f"📅 {exam_datetime_iso.replace('T', ' ')}\n"
+        f"📅 {iso_display(exam_datetime_iso)}\n"
         f"🆔 ID: {exam_id}",
         reply_markup=get_main_menu_keyboard()
     )
@@ -129,20 +124,30 @@ def get_add_exam_conversation_handler() -> ConversationHandler:
     """Create and return the ConversationHandler for adding exams."""
     return ConversationHandler(
         entry_points=[
-            MessageHandler(filters.Regex("^➕ Add Exam$"), start_add_exam),
+            # Literal button text - set membership beats a regex match
+            MessageHandler(filters.Text({"➕ Add Exam"}), start_add_exam),
             CommandHandler("add_start", start_add_exam)
         ],
         states={
+            # Cancel text is excluded here so it falls through to the
+            # cancel_conversation fallback instead of each state handler
+            # re-checking for it
             ASK_TITLE: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, receive_title)
+                MessageHandler(
+                    filters.TEXT & ~filters.COMMAND & ~filters.Text(_CANCEL_TOKENS),
+                    receive_title
+                )
             ],
             ASK_DATETIME: [
-                MessageHandler(filters.TEXT & ~filters.COMMAND, receive_datetime)
+                MessageHandler(
+                    filters.TEXT & ~filters.COMMAND & ~filters.Text(_CANCEL_TOKENS),
+                    receive_datetime
+                )
             ]
         },
         fallbacks=[
             CommandHandler("cancel", cancel_conversation),
-            MessageHandler(filters.Regex("^❌ Cancel$"), cancel_conversation)
+            MessageHandler(filters.Text(_CANCEL_TOKENS), cancel_conversation)
         ],
         name="add_exam_conversation",
         persistent=False
@@ -1,55 +1,370 @@
 """Database operations for users and exams - supports SQLite, PostgreSQL, and Firestore."""
 
+import asyncio
+import atexit
 import logging
+import queue
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Backend flags bound once at import so every DB call reads a module-level
+# bool instead of re-invoking the Config classmethods. init_db() clears
+# _USE_FIRESTORE if Firestore initialization fails and we fall back.
+_USE_FIRESTORE = Config.use_firestore()
+_USE_POSTGRES = Config.use_postgres()
+
 # Import Firestore module if using Firestore
-if Config.use_firestore():
+if _USE_FIRESTORE:
     from app import firestore_db
     _firestore_initialized = False
 else:
     firestore_db = None
     _firestore_initialized = False
 
-# Try to import psycopg2 for PostgreSQL support
-try:  # pragma: no cover - optional dependency
-    import psycopg2
-    from psycopg2.extras import RealDictCursor
+# Import the PostgreSQL driver only when a DATABASE_URL is configured -
+# SQLite deployments would otherwise pay the psycopg2 import for nothing
+if _USE_POSTGRES:
+    try:  # pragma: no cover - optional dependency
+        import psycopg2
+        from psycopg2.extras import execute_values
+        from psycopg2.pool import PoolError, ThreadedConnectionPool
 
-    POSTGRES_AVAILABLE = True
-except ImportError:  # pragma: no cover - optional dependency
+        POSTGRES_AVAILABLE = True
+    except ImportError:  # pragma: no cover - optional dependency
+        POSTGRES_AVAILABLE = False
+        logger.warning("psycopg2 not installed. PostgreSQL support disabled.")
+else:
     POSTGRES_AVAILABLE = False
-    logger.warning("psycopg2 not installed. PostgreSQL support disabled.")
+
+if POSTGRES_AVAILABLE:
+    class _PreparedConnectionPool(ThreadedConnectionPool):
+        """Connection pool that prepares the hot statements on each new connection."""
+
+        def _connect(self, key=None):
+            conn = super()._connect(key)
+            with conn.cursor() as cur:
+                cur.execute(_PG_PREPARE_HOT)
+            conn.commit()
+            return conn
+
+# SQL for the hot CRUD paths, specialized once at import for the active
+# backend's paramstyle ("%s" for psycopg2, "?" for sqlite3) so each call
+# executes a precomputed constant instead of rebranching on the dialect.
+# On PostgreSQL the hot statements are server-side prepared per connection
+# (see _PreparedConnectionPool) so each call skips parse/plan entirely;
+# SQLite gets the same effect from sqlite3's per-connection statement cache.
+_PH = "%s" if _USE_POSTGRES else "?"
+
+# Explicit column lists keep the wire format stable and avoid the server
+# expanding * per query; row order here matches the tuple unpacking in
+# get_all_users_with_exams
+_USER_COLS = "user_id, first_name, username, timezone, notify_time"
+_EXAM_COLS = "id, user_id, user_exam_id, title, exam_datetime_iso"
+
+_SQL_SELECT_ALL_USERS = f"SELECT {_USER_COLS} FROM users ORDER BY user_id"
+_SQL_ITER_USERS = (
+    f"SELECT {_USER_COLS} FROM users WHERE user_id > {_PH} "
+    f"ORDER BY user_id LIMIT {_PH}"
+)
+_SQL_TOUCH_USER = (
+    f"INSERT INTO users (user_id, timezone, notify_time) VALUES ({_PH}, {_PH}, {_PH}) "
+    "ON CONFLICT (user_id) DO NOTHING"
+)
+if _USE_POSTGRES:
+    _SQL_UPDATE_TIMEZONE = "EXECUTE exam_bot_update_tz(%s, %s)"
+    _SQL_UPDATE_NOTIFY_TIME = "EXECUTE exam_bot_update_notify(%s, %s)"
+    _SQL_SELECT_USER_EXAMS = "EXECUTE exam_bot_user_exams(%s)"
+    _SQL_DELETE_EXAM = "EXECUTE exam_bot_delete_exam(%s, %s)"
+    _SQL_SELECT_EXAM = "EXECUTE exam_bot_exam_by_id(%s, %s)"
+else:
+    _SQL_UPDATE_TIMEZONE = "UPDATE users SET timezone = ? WHERE user_id = ?"
+    _SQL_UPDATE_NOTIFY_TIME = "UPDATE users SET notify_time = ? WHERE user_id = ?"
+    _SQL_SELECT_USER_EXAMS = f"SELECT {_EXAM_COLS} FROM exams WHERE user_id = ? ORDER BY exam_datetime_iso"
+    _SQL_DELETE_EXAM = "DELETE FROM exams WHERE user_exam_id = ? AND user_id = ?"
+    _SQL_SELECT_EXAM = f"SELECT {_EXAM_COLS} FROM exams WHERE user_exam_id = ? AND user_id = ?"
+
+# One UPDATE covers every field combination: COALESCE keeps the current
+# value where the caller passed None, so a single statement (and a single
+# plan-cache slot) serves title-only, datetime-only and both-field edits
+if _USE_POSTGRES:
+    _SQL_UPDATE_EXAM = "EXECUTE exam_bot_update_exam(%s, %s, %s, %s)"
+else:
+    _SQL_UPDATE_EXAM = (
+        "UPDATE exams SET title = COALESCE(?, title), "
+        "exam_datetime_iso = COALESCE(?, exam_datetime_iso) "
+        "WHERE user_exam_id = ? AND user_id = ?"
+    )
+
+# Statements prepared once per PostgreSQL connection
+_PG_PREPARE_HOT = """
+    PREPARE exam_bot_update_tz AS
+        UPDATE users SET timezone = $1 WHERE user_id = $2;
+    PREPARE exam_bot_update_notify AS
+        UPDATE users SET notify_time = $1 WHERE user_id = $2;
+    PREPARE exam_bot_user_exams AS
+        SELECT {exam_cols} FROM exams WHERE user_id = $1 ORDER BY exam_datetime_iso;
+    PREPARE exam_bot_update_exam AS
+        UPDATE exams SET title = COALESCE($1, title),
+            exam_datetime_iso = COALESCE($2, exam_datetime_iso)
+        WHERE user_exam_id = $3 AND user_id = $4;
+    PREPARE exam_bot_delete_exam AS
+        DELETE FROM exams WHERE user_exam_id = $1 AND user_id = $2;
+    PREPARE exam_bot_exam_by_id AS
+        SELECT {exam_cols} FROM exams WHERE user_exam_id = $1 AND user_id = $2;
+""".format(exam_cols=_EXAM_COLS)
+
+# In-process cache of user rows keyed by user_id. Every Telegram message
+# triggers a get_or_create_user call just to read timezone/notify_time,
+# which change rarely; writes invalidate the entry. Entries also expire
+# after a TTL so a write from another process (or a direct DB edit) is
+# picked up within minutes rather than never.
+_USER_CACHE_MAX = 10_000
+_USER_CACHE_TTL = 300.0  # seconds
+_user_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+
+
+def _cache_user(user_id: int, user: Dict[str, Any]) -> None:
+    """Store a user row in the bounded in-process cache."""
+    if len(_user_cache) >= _USER_CACHE_MAX:
+        _user_cache.clear()
+    _user_cache[user_id] = (time.monotonic() + _USER_CACHE_TTL, user)
+
+
+def _cached_user(user_id: int) -> Optional[Dict[str, Any]]:
+    """Return a cached user row, dropping it if its TTL has lapsed."""
+    entry = _user_cache.get(user_id)
+    if entry is None:
+        return None
+    expires_at, user = entry
+    if time.monotonic() >= expires_at:
+        _user_cache.pop(user_id, None)
+        return None
+    return user
+
+# Lazily created PostgreSQL connection pool - reusing connections avoids a
+# TCP+TLS handshake per DB operation
+_pg_pool = None
+
+# Small pool of long-lived SQLite connections. run_db pushes DB calls
+# onto worker threads, and sharing a single connection across them would
+# serialize every operation (and risk interleaved transactions); with WAL
+# enabled, pooled connections let readers run alongside a writer.
+_SQLITE_POOL_SIZE = 8
+_sqlite_pool: "queue.Queue[sqlite3.Connection]" = queue.Queue()
+_sqlite_opened = 0
+_sqlite_open_lock = threading.Lock()
+
+
+def _get_pg_pool() -> "ThreadedConnectionPool":
+    """Return the shared PostgreSQL connection pool, creating it on first use."""
+    global _pg_pool
+    if _pg_pool is None:
+        _pg_pool = _PreparedConnectionPool(
+            Config.PG_POOL_MIN,
+            Config.PG_POOL_MAX,
+            Config.DATABASE_URL,
+        )
+        atexit.register(_pg_pool.closeall)
+    return _pg_pool
+
+
+# How long a caller waits for a PostgreSQL connection before giving up,
+# and how often it re-tries while the pool is exhausted
+_PG_ACQUIRE_TIMEOUT = 30.0
+_PG_ACQUIRE_RETRY_DELAY = 0.05
+
+
+def _acquire_pg_conn() -> Any:
+    """Check a connection out of the PG pool, waiting while it's exhausted.
+
+    ThreadedConnectionPool.getconn raises PoolError instead of blocking
+    when all PG_POOL_MAX connections are checked out; retrying behind a
+    deadline gives this path the same blocking semantics as the SQLite
+    pool's queue.get().
+    """
+    pool = _get_pg_pool()
+    deadline = time.monotonic() + _PG_ACQUIRE_TIMEOUT
+    while True:
+        try:
+            return pool.getconn()
+        except PoolError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(_PG_ACQUIRE_RETRY_DELAY)
+
+
+def _new_sqlite_conn() -> sqlite3.Connection:
+    """Open a SQLite connection with the standard per-connection PRAGMAs."""
+    conn = sqlite3.connect(Config.DB_PATH, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    # WAL allows concurrent readers and avoids rewriting the whole
+    # journal on every commit; the remaining PRAGMAs keep temp data and
+    # a ~20MB page cache in memory
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    # Memory-map the DB file (up to 256MB) so reads bypass the VFS
+    # read path and come straight from the page cache
+    conn.execute("PRAGMA mmap_size=268435456")
+    # With several pooled writers, wait for a lock instead of failing
+    # immediately with SQLITE_BUSY
+    conn.execute("PRAGMA busy_timeout=5000")
+    atexit.register(_close_sqlite_conn, conn)
+    return conn
+
+
+def _acquire_sqlite_conn() -> sqlite3.Connection:
+    """Check a SQLite connection out of the pool, opening one if under cap."""
+    global _sqlite_opened
+    try:
+        return _sqlite_pool.get_nowait()
+    except queue.Empty:
+        pass
+    with _sqlite_open_lock:
+        if _sqlite_opened < _SQLITE_POOL_SIZE:
+            _sqlite_opened += 1
+            return _new_sqlite_conn()
+    # Pool is at capacity and every connection is checked out; wait
+    return _sqlite_pool.get()
+
+
+def _release_sqlite_conn(conn: sqlite3.Connection) -> None:
+    """Return a connection to the pool."""
+    _sqlite_pool.put(conn)
+
+
+def _close_sqlite_conn(conn: sqlite3.Connection) -> None:
+    """Close the shared connection, refreshing planner stats on the way out.
+
+    PRAGMA optimize runs targeted ANALYZE passes in milliseconds, so the
+    next process start sees fresh statistics without a blocking VACUUM.
+    """
+    try:
+        conn.execute("PRAGMA optimize")
+    except sqlite3.Error:
+        pass
+    conn.close()
+
+
+# Connection owned by an enclosing transaction() block, if any. While set,
+# get_db() joins it instead of opening/committing its own scope. Thread-
+# local because run_db executes each DB call on a worker thread and two
+# threads must never share an open transaction.
+_txn_local = threading.local()
 
 
 @contextmanager
-def get_db():
-    """Context manager yielding a DB connection and handling commit/close."""
-    if Config.use_postgres():
+def transaction():
+    """Group several db operations into a single BEGIN...COMMIT.
+
+    Usage:
+        with db.transaction():
+            db.add_exam(...)
+            db.update_user_timezone(...)
+
+    Amortizes the per-commit fsync across all statements in the block.
+    Nested blocks join the outermost transaction.
+    """
+    if getattr(_txn_local, 'conn', None) is not None:
+        yield _txn_local.conn
+        return
+
+    if _USE_POSTGRES:
         if not POSTGRES_AVAILABLE:
             raise RuntimeError("PostgreSQL URL provided but psycopg2 not installed")
-        conn = psycopg2.connect(Config.DATABASE_URL, cursor_factory=RealDictCursor)
+        pool = _get_pg_pool()
+        conn = _acquire_pg_conn()
     else:
-        conn = sqlite3.connect(Config.DB_PATH)
-        conn.row_factory = sqlite3.Row
+        pool = None
+        conn = _acquire_sqlite_conn()
+
+    _txn_local.conn = conn
     try:
         yield conn
         conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
     finally:
-        conn.close()
+        _txn_local.conn = None
+        if pool is not None:
+            pool.putconn(conn)
+        else:
+            _release_sqlite_conn(conn)
+
+
+async def run_db(func, *args, **kwargs):
+    """Run a blocking db function in a worker thread.
+
+    The bot's handlers run on the asyncio event loop; awaiting this keeps
+    the loop free to process other updates during the DB round-trip.
+    """
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+@contextmanager
+def get_db():
+    """Context manager yielding a DB connection and handling commit/release."""
+    # Inside a transaction() block, reuse its connection and defer the
+    # commit/rollback to the enclosing scope
+    if getattr(_txn_local, 'conn', None) is not None:
+        yield _txn_local.conn
+        return
+
+    if _USE_POSTGRES:
+        if not POSTGRES_AVAILABLE:
+            raise RuntimeError("PostgreSQL URL provided but psycopg2 not installed")
+        pool = _get_pg_pool()
+        conn = _acquire_pg_conn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+        return
+
+    conn = _acquire_sqlite_conn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _release_sqlite_conn(conn)
+
+
+def _table_exists(cursor: Any, table_name: str) -> bool:
+    """Check whether a table exists in the current database."""
+    if _USE_POSTGRES:
+        cursor.execute(
+            "SELECT 1 FROM information_schema.tables WHERE table_name = %s",
+            (table_name,)
+        )
+    else:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table_name,)
+        )
+    return cursor.fetchone() is not None
 
 
 def init_db() -> None:
     """Initialize database (SQLite, PostgreSQL, or Firestore)."""
-    global _firestore_initialized
-    
-    if Config.use_firestore():
+    global _firestore_initialized, _USE_FIRESTORE
+
+    if _USE_FIRESTORE:
         try:
             firestore_db.init_firestore()
             _firestore_initialized = True
@@ -57,13 +372,19 @@ def init_db() -> None:
         except Exception as e:
             logger.error(f"Firestore initialization failed: {e}. Falling back to SQLite.")
             Config.USE_FIRESTORE = False
+            _USE_FIRESTORE = False
     
     # If not using Firestore (or failed to init), use SQLite/PostgreSQL
-    if not Config.use_firestore():
+    if not _USE_FIRESTORE:
+        global _schema_migrated
         # Existing SQLite/PostgreSQL initialization
         with get_db() as conn:
             cursor = conn.cursor()
-            if Config.use_postgres():
+            # A missing users table means a brand-new database; the CREATE
+            # TABLE statements below already include every column, so the
+            # ALTER-based migrations can be skipped entirely
+            fresh_db = not _table_exists(cursor, "users")
+            if _USE_POSTGRES:
                 cursor.execute(
                     """
                     CREATE TABLE IF NOT EXISTS users (
@@ -114,71 +435,111 @@ def init_db() -> None:
                 )
                 logger.info("SQLite database initialized successfully")
 
+            if fresh_db:
+                _schema_migrated = True
+            else:
+                try:
+                    _ensure_user_exam_id(conn, cursor)
+                except Exception as e:
+                    logger.error(f"Error in _ensure_user_exam_id: {e}. Continuing anyway.")
+
+                try:
+                    _ensure_user_info_columns(conn, cursor)
+                except Exception as e:
+                    logger.error(f"Error in _ensure_user_info_columns: {e}. Continuing anyway.")
+                    conn.rollback()
+
+            # Composite index so get_user_exams' ORDER BY exam_datetime_iso
+            # is index-backed instead of sorting per query
             try:
-                _ensure_user_exam_id(conn, cursor)
-            except Exception as e:
-                logger.error(f"Error in _ensure_user_exam_id: {e}. Continuing anyway.")
-            
-            try:
-                _ensure_user_info_columns(conn, cursor)
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_exams_user_dt ON exams(user_id, exam_datetime_iso)"
+                )
+                # Unconditional (fresh databases skip the migration path
+                # that also creates this): the unique constraint is the
+                # backstop that keeps concurrent add_exam calls from
+                # committing duplicate per-user exam ids
+                cursor.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_exams_user_exam_per_user ON exams(user_id, user_exam_id)"
+                )
+                # Refresh planner statistics so the index is actually picked
+                cursor.execute("ANALYZE")
             except Exception as e:
-                logger.error(f"Error in _ensure_user_info_columns: {e}. Continuing anyway.")
-                conn.rollback()
+                logger.debug(f"Index creation failed (might already exist): {e}")
 
 
-def _dict_row(row: Any) -> Dict[str, Any]:
-    """Convert a DB row to a plain dict."""
+def _dict_row(cursor: Any, row: Any) -> Dict[str, Any]:
+    """Convert a DB row to a plain dict using the cursor's column names."""
     if row is None:
         return {}
-    if isinstance(row, dict):
-        return row
-    return dict(row)
+    return dict(zip([d[0] for d in cursor.description], row))
+
+
+def _dict_rows(cursor: Any) -> List[Dict[str, Any]]:
+    """Fetch all rows from the cursor as plain dicts (one columns list)."""
+    cols = [d[0] for d in cursor.description]
+    return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+
+# Positive results from _has_column, keyed by (table, column). Columns are
+# only ever added, so a True answer can be cached for the process lifetime;
+# a False answer is re-checked after the ALTER that follows it.
+_column_cache: Dict[tuple, bool] = {}
 
 
 def _has_column(cursor: Any, table_name: str, column_name: str) -> bool:
-    """Return True if a column exists in the given table."""
-    if Config.use_postgres():
+    """Return True if a column exists in the given table (cached once true)."""
+    key = (table_name, column_name)
+    if _column_cache.get(key):
+        return True
+
+    if _USE_POSTGRES:
         cursor.execute(
             "SELECT 1 FROM information_schema.columns WHERE table_name = %s AND column_name = %s",
             (table_name, column_name),
         )
-        return cursor.fetchone() is not None
+        found = cursor.fetchone() is not None
+    else:
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        found = any(row[1] == column_name for row in cursor.fetchall())
 
-    cursor.execute(f"PRAGMA table_info({table_name})")
-    return any(row[1] == column_name for row in cursor.fetchall())
+    if found:
+        _column_cache[key] = True
+    return found
+
+
+# Set once the user_exam_id migration has run; the schema doesn't change
+# at runtime, so later calls can skip the PRAGMA/information_schema check.
+_schema_migrated = False
 
 
 def _ensure_user_exam_id(conn: Any, cursor: Any) -> None:
     """Ensure per-user exam IDs exist and are populated."""
+    global _schema_migrated
+    if _schema_migrated:
+        return
     try:
         # Check if column exists
         if not _has_column(cursor, "exams", "user_exam_id"):
             logger.info("Adding user_exam_id column to exams table...")
-            if Config.use_postgres():
-                cursor.execute("ALTER TABLE exams ADD COLUMN user_exam_id INTEGER")
-            else:
-                cursor.execute("ALTER TABLE exams ADD COLUMN user_exam_id INTEGER")
+            cursor.execute("ALTER TABLE exams ADD COLUMN user_exam_id INTEGER")
             conn.commit()
-    
+
         # Backfill missing user_exam_id values
         _backfill_user_exam_id(cursor)
-    
+
         # Create index if it doesn't exist
         try:
-            if Config.use_postgres():
-                cursor.execute(
-                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_exams_user_exam_per_user ON exams(user_id, user_exam_id)"
-                )
-            else:
-                cursor.execute(
-                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_exams_user_exam_per_user ON exams(user_id, user_exam_id)"
-                )
+            cursor.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_exams_user_exam_per_user ON exams(user_id, user_exam_id)"
+            )
         except Exception as e:
             logger.debug(f"Index creation failed (might already exist): {e}")
         
         conn.commit()
+        _schema_migrated = True
         logger.info("user_exam_id migration completed successfully")
-    
+
     except Exception as e:
         logger.error(f"Error in _ensure_user_exam_id: {e}")
         conn.rollback()
@@ -191,7 +552,7 @@ def _ensure_user_info_columns(conn: Any, cursor: Any) -> None:
         # Check and add first_name column
         if not _has_column(cursor, "users", "first_name"):
             logger.info("Adding first_name column to users table...")
-            if Config.use_postgres():
+            if _USE_POSTGRES:
                 cursor.execute("ALTER TABLE users ADD COLUMN first_name VARCHAR(255)")
             else:
                 cursor.execute("ALTER TABLE users ADD COLUMN first_name TEXT")
@@ -200,7 +561,7 @@ def _ensure_user_info_columns(conn: Any, cursor: Any) -> None:
         # Check and add username column
         if not _has_column(cursor, "users", "username"):
             logger.info("Adding username column to users table...")
-            if Config.use_postgres():
+            if _USE_POSTGRES:
                 cursor.execute("ALTER TABLE users ADD COLUMN username VARCHAR(255)")
             else:
                 cursor.execute("ALTER TABLE users ADD COLUMN username TEXT")
@@ -217,288 +578,475 @@ def _ensure_user_info_columns(conn: Any, cursor: Any) -> None:
 def _backfill_user_exam_id(cursor: Any) -> None:
     """Assign sequential user_exam_id per user for existing rows."""
     try:
-        if Config.use_postgres():
-            cursor.execute("SELECT DISTINCT user_id FROM exams WHERE user_exam_id IS NULL")
-        else:
-            cursor.execute("SELECT DISTINCT user_id FROM exams WHERE user_exam_id IS NULL")
-        
-        users_missing = cursor.fetchall()
-        
-        if not users_missing:
+        cursor.execute("SELECT COUNT(*) FROM exams WHERE user_exam_id IS NULL")
+        missing = int(cursor.fetchone()[0])
+
+        if not missing:
             logger.debug("No exams need user_exam_id backfill")
             return
-        
-        logger.info(f"Backfilling user_exam_id for {len(users_missing)} users...")
-
-        for row in users_missing:
-            user_id = row[0] if not isinstance(row, dict) else row.get("user_id")
-            if user_id is None:
-                continue
-            
-            if Config.use_postgres():
-                cursor.execute(
-                    "SELECT id FROM exams WHERE user_id = %s AND user_exam_id IS NULL ORDER BY id",
-                    (user_id,),
-                )
-            else:
-                cursor.execute(
-                    "SELECT id FROM exams WHERE user_id = ? AND user_exam_id IS NULL ORDER BY id",
-                    (user_id,),
+
+        logger.info(f"Backfilling user_exam_id for {missing} exams...")
+
+        # Number the missing rows per user in a single set-based UPDATE
+        # instead of one UPDATE round-trip per legacy row
+        if _USE_POSTGRES:
+            cursor.execute(
+                """
+                UPDATE exams e SET user_exam_id = t.rn
+                FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id) AS rn
+                    FROM exams WHERE user_exam_id IS NULL
+                ) t
+                WHERE e.id = t.id
+                """
+            )
+        elif sqlite3.sqlite_version_info >= (3, 25, 0):
+            cursor.execute(
+                """
+                WITH t AS (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY id) AS rn
+                    FROM exams WHERE user_exam_id IS NULL
                 )
-            
-            rows = cursor.fetchall()
-            for idx, exam_row in enumerate(rows, start=1):
-                exam_id = exam_row[0] if not isinstance(exam_row, dict) else exam_row.get("id")
-                if exam_id is None:
-                    continue
-                
-                if Config.use_postgres():
-                    cursor.execute(
-                        "UPDATE exams SET user_exam_id = %s WHERE id = %s",
-                        (idx, exam_id),
-                    )
-                else:
-                    cursor.execute(
-                        "UPDATE exams SET user_exam_id = ? WHERE id = ?",
-                        (idx, exam_id),
-                    )
-        
+                UPDATE exams SET user_exam_id = (SELECT rn FROM t WHERE t.id = exams.id)
+                WHERE id IN (SELECT id FROM t)
+                """
+            )
+        else:
+            # Old SQLite without window functions: number rows in Python but
+            # apply all updates in one executemany batch
+            cursor.execute(
+                "SELECT id, user_id FROM exams WHERE user_exam_id IS NULL ORDER BY user_id, id"
+            )
+            pairs = []
+            last_user_id = None
+            idx = 0
+            for exam_id, user_id in cursor.fetchall():
+                if user_id != last_user_id:
+                    last_user_id = user_id
+                    idx = 0
+                idx += 1
+                pairs.append((idx, exam_id))
+            cursor.executemany("UPDATE exams SET user_exam_id = ? WHERE id = ?", pairs)
+
         logger.info("Backfill completed successfully")
-    
+
     except Exception as e:
         logger.error(f"Error in _backfill_user_exam_id: {e}")
         raise
 
 
-def _next_user_exam_id(cursor: Any, user_id: int) -> int:
-    """Return next sequential exam id for the user."""
-    if Config.use_postgres():
-        cursor.execute("SELECT COALESCE(MAX(user_exam_id), 0) + 1 FROM exams WHERE user_id = %s", (user_id,))
-    else:
-        cursor.execute("SELECT COALESCE(MAX(user_exam_id), 0) + 1 FROM exams WHERE user_id = ?", (user_id,))
-    row = cursor.fetchone()
-    return int(row[0] if not isinstance(row, dict) else list(row.values())[0])
-
-
 def get_or_create_user(user_id: int, first_name: str = None, username: str = None) -> Dict[str, Any]:
     """Return user row; create with defaults if missing. Updates name/username if provided."""
-    if Config.use_firestore():
-        return firestore_db.get_or_create_user(user_id, first_name, username)
-    
-    # Existing SQLite/PostgreSQL code
+    # Plain lookups (no profile info to write) can be served from the cache
+    if first_name is None and username is None:
+        cached = _cached_user(user_id)
+        if cached is not None:
+            return cached
+
+    if _USE_FIRESTORE:
+        user = firestore_db.get_or_create_user(user_id, first_name, username)
+        _cache_user(user_id, user)
+        return user
+
+    # Existing SQLite/PostgreSQL code - a single UPSERT round-trip instead
+    # of SELECT + conditional INSERT/UPDATE + SELECT
     with get_db() as conn:
         cursor = conn.cursor()
-        if Config.use_postgres():
-            cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
+        user = _upsert_user(cursor, user_id, first_name, username)
+        _cache_user(user_id, user)
+        return user
+
+
+def _upsert_user(cursor: Any, user_id: int, first_name: Optional[str],
+                 username: Optional[str]) -> Dict[str, Any]:
+    """Upsert a user row on an open cursor and return it as a dict."""
+    params = (user_id, first_name, username, Config.DEFAULT_TIMEZONE, Config.DEFAULT_NOTIFY_TIME)
+    if _USE_POSTGRES:
+        cursor.execute(
+            f"""
+            INSERT INTO users (user_id, first_name, username, timezone, notify_time)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (user_id) DO UPDATE SET
+                first_name = COALESCE(EXCLUDED.first_name, users.first_name),
+                username = COALESCE(EXCLUDED.username, users.username)
+            RETURNING {_USER_COLS}
+            """,
+            params,
+        )
+        user = cursor.fetchone()
+    else:
+        upsert = """
+            INSERT INTO users (user_id, first_name, username, timezone, notify_time)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (user_id) DO UPDATE SET
+                first_name = COALESCE(excluded.first_name, first_name),
+                username = COALESCE(excluded.username, username)
+            """
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            cursor.execute(upsert + f"RETURNING {_USER_COLS}", params)
             user = cursor.fetchone()
-            if not user:
-                cursor.execute(
-                    "INSERT INTO users (user_id, first_name, username, timezone, notify_time) VALUES (%s, %s, %s, %s, %s)",
-                    (user_id, first_name, username, Config.DEFAULT_TIMEZONE, Config.DEFAULT_NOTIFY_TIME),
-                )
-                cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
-                user = cursor.fetchone()
-            elif first_name or username:
-                # Update existing user's info
-                cursor.execute(
-                    "UPDATE users SET first_name = COALESCE(%s, first_name), username = COALESCE(%s, username) WHERE user_id = %s",
-                    (first_name, username, user_id),
-                )
-                cursor.execute("SELECT * FROM users WHERE user_id = %s", (user_id,))
-                user = cursor.fetchone()
         else:
-            cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
+            # Older SQLite lacks RETURNING: upsert, then read back
+            cursor.execute(upsert, params)
+            cursor.execute(f"SELECT {_USER_COLS} FROM users WHERE user_id = ?", (user_id,))
             user = cursor.fetchone()
-            if not user:
-                cursor.execute(
-                    "INSERT INTO users (user_id, first_name, username, timezone, notify_time) VALUES (?, ?, ?, ?, ?)",
-                    (user_id, first_name, username, Config.DEFAULT_TIMEZONE, Config.DEFAULT_NOTIFY_TIME),
-                )
-                cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-                user = cursor.fetchone()
-            elif first_name or username:
-                # Update existing user's info
-                cursor.execute(
-                    "UPDATE users SET first_name = COALESCE(?, first_name), username = COALESCE(?, username) WHERE user_id = ?",
-                    (first_name, username, user_id),
-                )
-                cursor.execute("SELECT * FROM users WHERE user_id = ?", (user_id,))
-                user = cursor.fetchone()
-        return _dict_row(user)
+    return _dict_row(cursor, user)
 
 
 def update_user_timezone(user_id: int, timezone: str) -> None:
     """Update user's timezone."""
-    if Config.use_firestore():
+    _user_cache.pop(user_id, None)
+    if _USE_FIRESTORE:
         firestore_db.update_user_timezone(user_id, timezone)
     else:
         with get_db() as conn:
-            cursor = conn.cursor()
-            if Config.use_postgres():
-                cursor.execute(
-                    "UPDATE users SET timezone = %s WHERE user_id = %s",
-                    (timezone, user_id),
-                )
-            else:
-                cursor.execute(
-                    "UPDATE users SET timezone = ? WHERE user_id = ?",
-                    (timezone, user_id),
-                )
+            conn.cursor().execute(_SQL_UPDATE_TIMEZONE, (timezone, user_id))
 
 
 def update_user_notify_time(user_id: int, notify_time: str) -> None:
     """Update user's notification time."""
-    if Config.use_firestore():
+    _user_cache.pop(user_id, None)
+    if _USE_FIRESTORE:
         firestore_db.update_user_notify_time(user_id, notify_time)
     else:
         with get_db() as conn:
-            cursor = conn.cursor()
-            if Config.use_postgres():
-                cursor.execute(
-                    "UPDATE users SET notify_time = %s WHERE user_id = %s",
-                    (notify_time, user_id),
-                )
-            else:
-                cursor.execute(
-                    "UPDATE users SET notify_time = ? WHERE user_id = ?",
-                    (notify_time, user_id),
-                )
+            conn.cursor().execute(_SQL_UPDATE_NOTIFY_TIME, (notify_time, user_id))
 
 
 def add_exam(user_id: int, title: str, exam_datetime_iso: str) -> int:
     """Insert a new exam and return its per-user id."""
-    if Config.use_firestore():
+    if _USE_FIRESTORE:
         return firestore_db.add_exam(user_id, title, exam_datetime_iso)
     
-    # Existing SQLite/PostgreSQL code
+    # Existing SQLite/PostgreSQL code - the per-user id is assigned inside
+    # the INSERT itself, so there is no SELECT MAX / INSERT race window
+    # (schema migration already ran in init_db at startup)
+    params = (user_id, title, exam_datetime_iso, user_id)
     with get_db() as conn:
         cursor = conn.cursor()
-        try:
-            _ensure_user_exam_id(conn, cursor)
-        except Exception as e:
-            logger.warning(f"Migration warning: {e}")
-
-        user_exam_id = _next_user_exam_id(cursor, user_id)
-
-        if Config.use_postgres():
+        if _USE_POSTGRES:
             cursor.execute(
-                "INSERT INTO exams (user_id, user_exam_id, title, exam_datetime_iso) VALUES (%s, %s, %s, %s) RETURNING user_exam_id",
-                (user_id, user_exam_id, title, exam_datetime_iso),
+                """
+                INSERT INTO exams (user_id, user_exam_id, title, exam_datetime_iso)
+                SELECT %s, COALESCE(MAX(user_exam_id), 0) + 1, %s, %s
+                FROM exams WHERE user_id = %s
+                RETURNING user_exam_id
+                """,
+                params,
             )
-            row = cursor.fetchone()
-            return int(row["user_exam_id"] if isinstance(row, dict) else row[0])
+            return int(cursor.fetchone()[0])
+
+        insert = """
+            INSERT INTO exams (user_id, user_exam_id, title, exam_datetime_iso)
+            SELECT ?, COALESCE(MAX(user_exam_id), 0) + 1, ?, ?
+            FROM exams WHERE user_id = ?
+            """
+        if sqlite3.sqlite_version_info >= (3, 35, 0):
+            cursor.execute(insert + "RETURNING user_exam_id", params)
+            return int(cursor.fetchone()[0])
+        # Older SQLite lacks RETURNING: read the id of the row just inserted
+        cursor.execute(insert, params)
+        cursor.execute("SELECT user_exam_id FROM exams WHERE id = last_insert_rowid()")
+        return int(cursor.fetchone()[0])
+
+
+def bulk_add_exams(user_id: int, rows: List[tuple]) -> List[int]:
+    """Insert many (title, exam_datetime_iso) pairs for a user in one batch.
+
+    Returns the assigned per-user exam ids. One statement / one commit
+    instead of a round-trip and fsync per exam.
+    """
+    if not rows:
+        return []
+
+    if _USE_FIRESTORE:
+        return [firestore_db.add_exam(user_id, title, dt) for title, dt in rows]
+
+    with get_db() as conn:
+        cursor = conn.cursor()
         cursor.execute(
-            "INSERT INTO exams (user_id, user_exam_id, title, exam_datetime_iso) VALUES (?, ?, ?, ?)",
-            (user_id, user_exam_id, title, exam_datetime_iso),
+            f"SELECT COALESCE(MAX(user_exam_id), 0) FROM exams WHERE user_id = {_PH}",
+            (user_id,),
         )
-        return int(user_exam_id)
+        start = int(cursor.fetchone()[0]) + 1
+        ids = list(range(start, start + len(rows)))
+        values = [(user_id, ueid, title, dt) for ueid, (title, dt) in zip(ids, rows)]
+        if _USE_POSTGRES:
+            execute_values(
+                cursor,
+                "INSERT INTO exams (user_id, user_exam_id, title, exam_datetime_iso) VALUES %s",
+                values,
+            )
+        else:
+            cursor.executemany(
+                "INSERT INTO exams (user_id, user_exam_id, title, exam_datetime_iso) VALUES (?, ?, ?, ?)",
+                values,
+            )
+        return ids
 
 
 def get_user_exams(user_id: int) -> List[Dict[str, Any]]:
     """Return all exams for a user ordered by datetime."""
-    if Config.use_firestore():
+    if _USE_FIRESTORE:
         return firestore_db.get_user_exams(user_id)
     
     # Existing SQLite/PostgreSQL code
     with get_db() as conn:
         cursor = conn.cursor()
-        if Config.use_postgres():
-            cursor.execute(
-                "SELECT * FROM exams WHERE user_id = %s ORDER BY exam_datetime_iso",
-                (user_id,),
-            )
-        else:
-            cursor.execute(
-                "SELECT * FROM exams WHERE user_id = ? ORDER BY exam_datetime_iso",
-                (user_id,),
-            )
-        return [_dict_row(row) for row in cursor.fetchall()]
+        cursor.execute(_SQL_SELECT_USER_EXAMS, (user_id,))
+        return _dict_rows(cursor)
+
+
+def touch_user(user_id: int) -> None:
+    """Ensure a user row exists without reading it back.
+
+    Cheaper than get_or_create_user for callers that discard the row: a
+    cached user costs nothing, otherwise a single conflict-ignoring
+    INSERT with no SELECT or dict build.
+    """
+    if _cached_user(user_id) is not None:
+        return
+
+    if _USE_FIRESTORE:
+        # Firestore has no create-if-missing without a read; the regular
+        # path also primes the cache for the next call
+        get_or_create_user(user_id)
+        return
+
+    with get_db() as conn:
+        conn.cursor().execute(
+            _SQL_TOUCH_USER,
+            (user_id, Config.DEFAULT_TIMEZONE, Config.DEFAULT_NOTIFY_TIME),
+        )
+
+
+def get_user_with_exams(user_id: int) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Return (user, exams) in a single connection checkout.
+
+    The list/refresh/delete views always need both; combining them saves
+    a round-trip (and a worker-thread hop through run_db) per render.
+    """
+    if _USE_FIRESTORE:
+        return get_or_create_user(user_id), get_user_exams(user_id)
+
+    user = _cached_user(user_id)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        if user is None:
+            user = _upsert_user(cursor, user_id, None, None)
+            _cache_user(user_id, user)
+        cursor.execute(_SQL_SELECT_USER_EXAMS, (user_id,))
+        exams = _dict_rows(cursor)
+    return user, exams
 
 
 def get_all_users() -> List[Dict[str, Any]]:
     """Return all users."""
-    if Config.use_firestore():
+    if _USE_FIRESTORE:
         return firestore_db.get_all_users()
     
     # Existing SQLite/PostgreSQL code
     with get_db() as conn:
         cursor = conn.cursor()
-        if Config.use_postgres():
-            cursor.execute("SELECT * FROM users ORDER BY user_id")
+        cursor.execute(_SQL_SELECT_ALL_USERS)
+        return _dict_rows(cursor)
+
+
+def iter_all_users(chunk_size: int = 500):
+    """Yield users in lists of up to chunk_size rows.
+
+    Keyset pagination on user_id keeps every page an indexed range scan
+    and the caller's memory at O(chunk_size), so fan-out jobs like
+    broadcasts can start sending before the full user table is read.
+    """
+    if _USE_FIRESTORE:
+        yield from firestore_db.iter_all_users(chunk_size)
+        return
+
+    last_id = -(1 << 63)
+    while True:
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_ITER_USERS, (last_id, chunk_size))
+            rows = _dict_rows(cursor)
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1]['user_id']
+
+
+# Ids per IN (...) query in the bulk readers. Older SQLite caps host
+# parameters at 999, and one reminder group can span the whole user base
+_BULK_IN_CHUNK = 500
+
+
+def get_users_bulk(user_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Return existing users keyed by user_id, in one IN (...) query.
+
+    For grouped fan-out (shared reminder jobs) this replaces a round-trip
+    per member with a single SELECT; cached users are served without
+    touching the database at all. Unknown ids are simply absent from the
+    result — no rows are created.
+    """
+    if not user_ids:
+        return {}
+
+    if _USE_FIRESTORE:
+        # No multi-get in the wrapper; plain per-doc reads keep the
+        # read-only contract (missing users are skipped, not created)
+        users: Dict[int, Dict[str, Any]] = {}
+        for uid in user_ids:
+            user = _cached_user(uid)
+            if user is None:
+                user = firestore_db.get_user(uid)
+                if user is None:
+                    continue
+                _cache_user(uid, user)
+            users[uid] = user
+        return users
+
+    users: Dict[int, Dict[str, Any]] = {}
+    missing: List[int] = []
+    for uid in user_ids:
+        cached = _cached_user(uid)
+        if cached is not None:
+            users[uid] = cached
         else:
-            cursor.execute("SELECT * FROM users ORDER BY user_id")
-        return [_dict_row(row) for row in cursor.fetchall()]
+            missing.append(uid)
+
+    if missing:
+        with get_db() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(missing), _BULK_IN_CHUNK):
+                batch = missing[start:start + _BULK_IN_CHUNK]
+                placeholders = ", ".join([_PH] * len(batch))
+                cursor.execute(
+                    f"SELECT {_USER_COLS} FROM users WHERE user_id IN ({placeholders})",
+                    tuple(batch),
+                )
+                for row in _dict_rows(cursor):
+                    users[row['user_id']] = row
+                    _cache_user(row['user_id'], row)
+    return users
+
+
+def get_exams_bulk(user_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Return each user's exams keyed by user_id, in one IN (...) query.
+
+    Every requested id gets an entry (empty list when the user has no
+    exams); per-user lists come back ordered by exam datetime.
+    """
+    if not user_ids:
+        return {}
+
+    if _USE_FIRESTORE:
+        return {uid: firestore_db.get_user_exams(uid) for uid in user_ids}
+
+    exams: Dict[int, List[Dict[str, Any]]] = {uid: [] for uid in user_ids}
+    with get_db() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(user_ids), _BULK_IN_CHUNK):
+            batch = user_ids[start:start + _BULK_IN_CHUNK]
+            placeholders = ", ".join([_PH] * len(batch))
+            cursor.execute(
+                f"SELECT {_EXAM_COLS} FROM exams WHERE user_id IN ({placeholders}) "
+                "ORDER BY user_id, exam_datetime_iso",
+                tuple(batch),
+            )
+            for row in _dict_rows(cursor):
+                exams[row['user_id']].append(row)
+    return exams
+
+
+def get_all_users_with_exams() -> List[Dict[str, Any]]:
+    """Return all users, each with an 'exams' list, in a single query.
+
+    Avoids the get_all_users + get_user_exams-per-user N+1 pattern.
+    """
+    if _USE_FIRESTORE:
+        # One collection-group query over every exams subcollection
+        # replaces the per-user fetch loop
+        exams_by_user: Dict[int, List[Dict[str, Any]]] = {}
+        for exam in firestore_db.get_all_exams():
+            exams_by_user.setdefault(exam['user_id'], []).append(exam)
+        users = firestore_db.get_all_users()
+        for user in users:
+            exams = exams_by_user.get(user['user_id'], [])
+            exams.sort(key=lambda e: e['exam_datetime_iso'])
+            user['exams'] = exams
+        return users
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT u.user_id, u.first_name, u.username, u.timezone, u.notify_time,
+                   e.user_exam_id, e.title, e.exam_datetime_iso
+            FROM users u
+            LEFT JOIN exams e ON e.user_id = u.user_id
+            ORDER BY u.user_id, e.exam_datetime_iso
+            """
+        )
+        users: List[Dict[str, Any]] = []
+        current: Optional[Dict[str, Any]] = None
+        for user_id, first_name, username, timezone, notify_time, user_exam_id, title, dt_iso in cursor.fetchall():
+            if current is None or current['user_id'] != user_id:
+                current = {
+                    'user_id': user_id,
+                    'first_name': first_name,
+                    'username': username,
+                    'timezone': timezone,
+                    'notify_time': notify_time,
+                    'exams': [],
+                }
+                users.append(current)
+            # LEFT JOIN emits one all-NULL exam row for users without exams
+            if title is not None:
+                current['exams'].append({
+                    'user_id': user_id,
+                    'user_exam_id': user_exam_id,
+                    'title': title,
+                    'exam_datetime_iso': dt_iso,
+                })
+        return users
 
 
 def delete_exam(user_exam_id: int, user_id: int) -> bool:
     """Delete an exam (only if it belongs to the user)."""
-    if Config.use_firestore():
+    if _USE_FIRESTORE:
         return firestore_db.delete_exam(user_exam_id, user_id)
     
     # Existing SQLite/PostgreSQL code
     with get_db() as conn:
         cursor = conn.cursor()
-        if Config.use_postgres():
-            cursor.execute(
-                "DELETE FROM exams WHERE user_exam_id = %s AND user_id = %s",
-                (user_exam_id, user_id),
-            )
-        else:
-            cursor.execute(
-                "DELETE FROM exams WHERE user_exam_id = ? AND user_id = ?",
-                (user_exam_id, user_id),
-            )
+        cursor.execute(_SQL_DELETE_EXAM, (user_exam_id, user_id))
         return cursor.rowcount > 0
 
 
 def get_exam_by_id(user_exam_id: int, user_id: int) -> Optional[Dict[str, Any]]:
     """Get a specific exam by per-user ID (only if it belongs to the user)."""
-    if Config.use_firestore():
+    if _USE_FIRESTORE:
         return firestore_db.get_exam_by_id(user_exam_id, user_id)
     
     # Existing SQLite/PostgreSQL code
     with get_db() as conn:
         cursor = conn.cursor()
-        if Config.use_postgres():
-            cursor.execute(
-                "SELECT * FROM exams WHERE user_exam_id = %s AND user_id = %s",
-                (user_exam_id, user_id),
-            )
-        else:
-            cursor.execute(
-                "SELECT * FROM exams WHERE user_exam_id = ? AND user_id = ?",
-                (user_exam_id, user_id),
-            )
+        cursor.execute(_SQL_SELECT_EXAM, (user_exam_id, user_id))
         row = cursor.fetchone()
-        return _dict_row(row) if row else None
+        return _dict_row(cursor, row) if row else None
 
 
 def update_exam(user_exam_id: int, user_id: int, title: str = None, exam_datetime_iso: str = None) -> bool:
     """Update an exam's title and/or datetime (only if it belongs to the user)."""
-    if Config.use_firestore():
+    if _USE_FIRESTORE:
         return firestore_db.update_exam(user_exam_id, user_id, title, exam_datetime_iso)
     
-    # Build the SET clause dynamically
-    updates = []
-    params = []
-    
-    if title is not None:
-        updates.append("title = %s" if Config.use_postgres() else "title = ?")
-        params.append(title)
-    if exam_datetime_iso is not None:
-        updates.append("exam_datetime_iso = %s" if Config.use_postgres() else "exam_datetime_iso = ?")
-        params.append(exam_datetime_iso)
-    
-    if not updates:
+    if title is None and exam_datetime_iso is None:
         return False
-    
-    params.extend([user_exam_id, user_id])
-    
+
+    # COALESCE in the statement keeps the current value for None params,
+    # so every field combination goes through the same prepared UPDATE
     with get_db() as conn:
         cursor = conn.cursor()
-        if Config.use_postgres():
-            query = f"UPDATE exams SET {', '.join(updates)} WHERE user_exam_id = %s AND user_id = %s"
-        else:
-            query = f"UPDATE exams SET {', '.join(updates)} WHERE user_exam_id = ? AND user_id = ?"
-        cursor.execute(query, params)
+        cursor.execute(_SQL_UPDATE_EXAM, (title, exam_datetime_iso, user_exam_id, user_id))
         return cursor.rowcount > 0
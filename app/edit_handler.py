@@ -11,7 +11,8 @@ from telegram.ext import (
     filters
 )
 from app import db
-from app.utils import parse_exam_datetime, format_exam_countdown
+from app.config import Config
+from app.utils import parse_exam_datetime, format_exam_countdown, iso_display, user_today
 from app.keyboards import (
     get_main_menu_keyboard,
     get_cancel_keyboard,
@@ -24,18 +25,31 @@ logger = logging.getLogger(__name__)
 # Conversation states
 SELECT_EXAM, SELECT_FIELD, EDIT_TITLE, EDIT_DATETIME = range(4)
 
+# Button texts are exact literals, so a set-membership Text filter built
+# once at import beats re-creating Regex filters
+_EDIT_EXAM_FILTER = filters.Text({"✏️ Edit Exam"})
+_CANCEL_FILTER = filters.Text({"❌ Cancel"})
+
+# Snapshot the admin id once; it never changes after startup
+_ADMIN_ID = Config.ADMIN_ID
+
+# Per-exam line template, formatted once per row instead of assembling
+# several f-string pieces in the render loop
+_EXAM_LINE_TMPL = "🆔 {uid}: {title}\n   📅 {dt}\n   ⏳ {cd}\n"
+
 
 def is_admin(user_id: int) -> bool:
     """Check if user is admin."""
-    from app.config import Config
-    return user_id == Config.ADMIN_ID
+    return user_id == _ADMIN_ID
 
 
 async def start_edit_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start the edit exam conversation - show list of exams to edit."""
     user_id = update.effective_user.id
-    user = db.get_or_create_user(user_id)
-    exams = db.get_user_exams(user_id)
+    # Run the blocking DB calls in a worker thread so the event loop
+    # keeps serving other updates
+    user = await db.run_db(db.get_or_create_user, user_id)
+    exams = await db.run_db(db.get_user_exams, user_id)
     
     if not exams:
         await update.message.reply_text(
@@ -46,18 +60,19 @@ async def start_edit_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return ConversationHandler.END
     
     # Build message with exam list
+    today = user_today(user['timezone'])
+    top = exams[:10]
     lines = ["✏️ **Select exam to edit:**\n"]
-    for exam in exams[:10]:
-        countdown_msg, _ = format_exam_countdown(
-            exam['exam_datetime_iso'],
-            user['timezone']
-        )
-        lines.append(
-            f"🆔 {exam['user_exam_id']}: {exam['title']}\n"
-            f"   📅 {exam['exam_datetime_iso'].replace('T', ' ')}\n"
-            f"   ⏳ {countdown_msg}\n"
+    lines.extend(
+        _EXAM_LINE_TMPL.format(
+            uid=exam['user_exam_id'],
+            title=exam['title'],
+            dt=iso_display(exam['exam_datetime_iso']),
+            cd=format_exam_countdown(exam['exam_datetime_iso'], user['timezone'], today)[0]
         )
-    
+        for exam in top
+    )
+
     message_text = '\n'.join(lines)
     keyboard = get_exam_edit_inline_keyboard(exams)
     
@@ -97,7 +112,7 @@ async def select_exam_callback(update: Update, context: ContextTypes.DEFAULT_TYP
         return SELECT_EXAM
     
     # Get exam details
-    exam = db.get_exam_by_id(exam_id, user_id)
+    exam = await db.run_db(db.get_exam_by_id, exam_id, user_id)
     
     if not exam:
         await query.edit_message_text(
@@ -113,7 +128,7 @@ async def select_exam_callback(update: Update, context: ContextTypes.DEFAULT_TYP
     await query.edit_message_text(
         f"✏️ **Editing Exam #{exam_id}:**\n\n"
         f"📚 Title: {exam['title']}\n"
-        f"📅 Date: {exam['exam_datetime_iso'].replace('T', ' ')}\n\n"
+        f"📅 Date: {iso_display(exam['exam_datetime_iso'])}\n\n"
         f"What do you want to edit?",
         parse_mode='Markdown',
         reply_markup=get_edit_field_keyboard(exam_id)
@@ -197,7 +212,7 @@ async def receive_new_title(update: Update, context: ContextTypes.DEFAULT_TYPE)
     exam_id = context.user_data.get('edit_exam_id')
     
     # Update in database
-    success = db.update_exam(exam_id, user_id, title=new_title)
+    success = await db.run_db(db.update_exam, exam_id, user_id, title=new_title)
     
     if success:
         await update.message.reply_text(
@@ -205,7 +220,7 @@ async def receive_new_title(update: Update, context: ContextTypes.DEFAULT_TYPE)
             f"📚 New title: {new_title}",
             reply_markup=get_main_menu_keyboard(is_admin(user_id))
         )
-        logger.info(f"User {user_id} updated exam {exam_id} title to: {new_title}")
+        logger.info("User %s updated exam %s title to: %s", user_id, exam_id, new_title)
     else:
         await update.message.reply_text(
             f"⚠️ Failed to update exam. Please try again.",
@@ -246,15 +261,15 @@ async def receive_new_datetime(update: Update, context: ContextTypes.DEFAULT_TYP
     exam_id = context.user_data.get('edit_exam_id')
     
     # Update in database
-    success = db.update_exam(exam_id, user_id, exam_datetime_iso=exam_datetime_iso)
+    success = await db.run_db(db.update_exam, exam_id, user_id, exam_datetime_iso=exam_datetime_iso)
     
     if success:
         await update.message.reply_text(
             f"✅ Exam date updated successfully!\n\n"
-            f"📅 New date: {exam_datetime_iso.replace('T', ' ')}",
+            f"📅 New date: {iso_display(exam_datetime_iso)}",
             reply_markup=get_main_menu_keyboard(is_admin(user_id))
         )
-        logger.info(f"User {user_id} updated exam {exam_id} datetime to: {exam_datetime_iso}")
+        logger.info("User %s updated exam %s datetime to: %s", user_id, exam_id, exam_datetime_iso)
     else:
         await update.message.reply_text(
             f"⚠️ Failed to update exam. Please try again.",
@@ -280,7 +295,7 @@ def get_edit_exam_conversation_handler() -> ConversationHandler:
     """Create and return the ConversationHandler for editing exams."""
     return ConversationHandler(
         entry_points=[
-            MessageHandler(filters.Regex("^✏️ Edit Exam$"), start_edit_exam),
+            MessageHandler(_EDIT_EXAM_FILTER, start_edit_exam),
             CommandHandler("edit", start_edit_exam)
         ],
         states={
@@ -299,7 +314,7 @@ def get_edit_exam_conversation_handler() -> ConversationHandler:
         },
         fallbacks=[
             CommandHandler("cancel", cancel_edit),
-            MessageHandler(filters.Regex("^❌ Cancel$"), cancel_edit)
+            MessageHandler(_CANCEL_FILTER, cancel_edit)
         ],
         name="edit_exam_conversation",
         persistent=False
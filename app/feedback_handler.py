@@ -1,6 +1,8 @@
 """Feedback handler for user feedback system."""
 
 import logging
+import time
+from collections import defaultdict, deque
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     ContextTypes,
@@ -17,6 +19,27 @@ logger = logging.getLogger(__name__)
 # Conversation states
 ASK_FEEDBACK = 0
 
+# Exact button texts matched with a set-based Text filter built once at
+# import instead of per-handler Regex objects
+_FEEDBACK_FILTER = filters.Text({"💬 Feedback"})
+_CANCEL_FILTER = filters.Text({"❌ Cancel"})
+
+# Admin notification template, defined once instead of rebuilt per
+# submission; also the single place to touch for wording changes
+_ADMIN_TMPL = (
+    "📨 <b>New Feedback:</b>\n\n"
+    "👤 Name: {name}\n"
+    "🆔 User ID: <code>{uid}</code>\n"
+    "📱 Username: {username}\n\n"
+    "💬 <b>Message:</b>\n{msg}"
+)
+
+# Sliding-window limit on forwards to the admin: each user's last send
+# times live in a bounded deque, so the check is O(1) per submission
+_RATE_LIMIT = 5
+_RATE_WINDOW_SECONDS = 600.0
+_recent_sends = defaultdict(lambda: deque(maxlen=_RATE_LIMIT))
+
 
 async def start_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Start the feedback conversation."""
@@ -51,6 +74,17 @@ async def receive_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         )
         return ASK_FEEDBACK
     
+    # Throttle spammers before doing any Telegram API work
+    now = time.monotonic()
+    sends = _recent_sends[user.id]
+    if len(sends) == _RATE_LIMIT and now - sends[0] < _RATE_WINDOW_SECONDS:
+        await update.message.reply_text(
+            "⚠️ You've sent too much feedback recently. Please try again later.",
+            reply_markup=get_main_menu_keyboard()
+        )
+        return ConversationHandler.END
+    sends.append(now)
+
     # Send to admin
     admin_id = Config.ADMIN_ID
     if admin_id <= 0:
@@ -62,21 +96,18 @@ async def receive_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
         return ConversationHandler.END
     
     # Format message for admin (using HTML for better compatibility)
-    username_display = f"@{user.username}" if user.username else "N/A"
-    admin_message = (
-        f"📨 <b>New Feedback:</b>\n\n"
-        f"👤 Name: {user.first_name} {user.last_name or ''}\n"
-        f"🆔 User ID: <code>{user.id}</code>\n"
-        f"📱 Username: {username_display}\n\n"
-        f"💬 <b>Message:</b>\n{feedback_text}"
+    admin_message = _ADMIN_TMPL.format(
+        name=f"{user.first_name} {user.last_name or ''}",
+        uid=user.id,
+        username="@" + user.username if user.username else "N/A",
+        msg=feedback_text
     )
-    
-    # Create reply button
-    reply_keyboard = InlineKeyboardMarkup([
-        [InlineKeyboardButton("↩️ Reply", callback_data=f"reply:{user.id}")]
-    ])
-    
+
     try:
+        # Build the reply button only on the send path
+        reply_keyboard = InlineKeyboardMarkup([
+            [InlineKeyboardButton("↩️ Reply", callback_data=f"reply:{user.id}")]
+        ])
         await context.bot.send_message(
             chat_id=admin_id,
             text=admin_message,
@@ -92,10 +123,10 @@ async def receive_feedback(update: Update, context: ContextTypes.DEFAULT_TYPE) -
             parse_mode='Markdown'
         )
         
-        logger.info(f"Feedback from user {user.id} ({user.first_name}): {feedback_text[:50]}...")
+        logger.info("Feedback from user %s (%s): %s...", user.id, user.first_name, feedback_text[:50])
         
     except Exception as e:
-        logger.error(f"Error sending feedback to admin {admin_id}: {e}", exc_info=True)
+        logger.error("Error sending feedback to admin %s: %s", admin_id, e, exc_info=True)
         await update.message.reply_text(
             "❌ Error sending feedback. Please try again.",
             reply_markup=get_main_menu_keyboard()
@@ -118,7 +149,7 @@ def get_feedback_conversation_handler() -> ConversationHandler:
     """Create and return the ConversationHandler for feedback."""
     return ConversationHandler(
         entry_points=[
-            MessageHandler(filters.Regex("^💬 Feedback$"), start_feedback),
+            MessageHandler(_FEEDBACK_FILTER, start_feedback),
             CommandHandler("feedback", start_feedback)
         ],
         states={
@@ -128,7 +159,7 @@ def get_feedback_conversation_handler() -> ConversationHandler:
         },
         fallbacks=[
             CommandHandler("cancel", cancel_feedback),
-            MessageHandler(filters.Regex("^❌ Cancel$"), cancel_feedback)
+            MessageHandler(_CANCEL_FILTER, cancel_feedback)
         ],
         name="feedback_conversation",
         persistent=False
@@ -1,47 +1,56 @@
 """Firestore database operations for users and exams."""
 
 import logging
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 import firebase_admin
 from firebase_admin import credentials, firestore
+from google.api_core.exceptions import NotFound
 from app.config import Config
 
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase
-_db = None
 
+@lru_cache(maxsize=1)
+def get_firestore() -> Any:
+    """Get the shared Firestore client, initializing it on first use.
 
-def init_firestore() -> None:
-    """Initialize Firestore connection."""
-    global _db
-    
+    The cache makes every later call a plain lookup; a failed init is
+    not cached, so retries still work.
+    """
     try:
         if not firebase_admin._apps:
             cred = credentials.Certificate(Config.GOOGLE_APPLICATION_CREDENTIALS)
             firebase_admin.initialize_app(cred, {
                 'projectId': Config.FIREBASE_PROJECT_ID
             })
-        
-        _db = firestore.client()
+
+        db = firestore.client()
         logger.info("Firestore initialized successfully")
+        return db
     except Exception as e:
-        logger.error(f"Error initializing Firestore: {e}")
+        logger.error("Error initializing Firestore: %s", e)
         raise
 
 
-def get_firestore() -> Any:
-    """Get Firestore client."""
-    global _db
-    if _db is None:
-        init_firestore()
-    return _db
+def init_firestore() -> None:
+    """Eagerly initialize the Firestore client at startup."""
+    get_firestore()
+
+
+@lru_cache(maxsize=10_000)
+def _user_ref(user_id: int) -> Any:
+    """Cache DocumentReference objects for hot users.
+
+    Saves the str() conversion and two reference constructions that
+    otherwise run on every single DB call.
+    """
+    return get_firestore().collection('users').document(str(user_id))
 
 
 def get_or_create_user(user_id: int, first_name: str = None, username: str = None) -> Dict[str, Any]:
     """Get user or create with defaults. Updates name/username if provided."""
-    db = get_firestore()
-    user_ref = db.collection('users').document(str(user_id))
+    user_ref = _user_ref(user_id)
     user_doc = user_ref.get()
     
     if user_doc.exists:
@@ -55,7 +64,7 @@ def get_or_create_user(user_id: int, first_name: str = None, username: str = Non
         if updates:
             user_ref.update(updates)
             user_data.update(updates)
-            logger.info(f"Updated user info for {user_id}: {updates}")
+            logger.info("Updated user info for %s: %s", user_id, updates)
         return user_data
     else:
         user_data = {
@@ -63,70 +72,94 @@ def get_or_create_user(user_id: int, first_name: str = None, username: str = Non
             'first_name': first_name,
             'username': username,
             'timezone': Config.DEFAULT_TIMEZONE,
-            'notify_time': Config.DEFAULT_NOTIFY_TIME
+            'notify_time': Config.DEFAULT_NOTIFY_TIME,
+            'next_exam_id': 0
         }
         user_ref.set(user_data)
-        logger.info(f"Created new user: {user_id} ({first_name})")
+        logger.info("Created new user: %s (%s)", user_id, first_name)
         return user_data
 
 
+def get_user(user_id: int) -> Optional[Dict[str, Any]]:
+    """Return a user's document as a dict, or None if it doesn't exist."""
+    doc = _user_ref(user_id).get()
+    return doc.to_dict() if doc.exists else None
+
+
 def update_user_timezone(user_id: int, timezone: str) -> None:
     """Update user's timezone."""
-    db = get_firestore()
-    db.collection('users').document(str(user_id)).update({
-        'timezone': timezone
-    })
+    # set+merge upserts in one RPC, so callers don't need an ensure-exists
+    # read first
+    _user_ref(user_id).set({'timezone': timezone}, merge=True)
 
 
 def update_user_notify_time(user_id: int, notify_time: str) -> None:
     """Update user's notification time."""
-    db = get_firestore()
-    db.collection('users').document(str(user_id)).update({
-        'notify_time': notify_time
-    })
+    _user_ref(user_id).set({'notify_time': notify_time}, merge=True)
 
 
-def add_exam(user_id: int, title: str, exam_datetime_iso: str) -> int:
-    """Add exam and return per-user exam ID."""
-    db = get_firestore()
-    
-    # Get next user_exam_id
-    user_ref = db.collection('users').document(str(user_id))
-    exams = user_ref.collection('exams').stream()
-    max_id = 0
-    for exam in exams:
-        exam_data = exam.to_dict()
-        if 'user_exam_id' in exam_data and exam_data['user_exam_id'] > max_id:
-            max_id = exam_data['user_exam_id']
-    
-    user_exam_id = max_id + 1
-    
-    # Add exam
+@firestore.transactional
+def _add_exam_txn(transaction: Any, user_ref: Any, user_id: int, title: str,
+                  exam_datetime_iso: str) -> int:
+    """Allocate the next exam ID and write the exam in one transaction."""
+    snapshot = user_ref.get(transaction=transaction)
+    user_data = snapshot.to_dict() if snapshot.exists else {}
+
+    next_id = user_data.get('next_exam_id')
+    if next_id is None:
+        # One-time migration for users created before the counter field:
+        # derive it from the existing max id, still inside the transaction
+        docs = user_ref.collection('exams').stream(transaction=transaction)
+        next_id = max((doc.to_dict().get('user_exam_id', 0) for doc in docs), default=0)
+
+    user_exam_id = next_id + 1
+
     exam_data = {
         'user_id': user_id,
         'user_exam_id': user_exam_id,
         'title': title,
         'exam_datetime_iso': exam_datetime_iso
     }
-    
-    user_ref.collection('exams').document(str(user_exam_id)).set(exam_data)
-    logger.info(f"Added exam for user {user_id}: {title} (ID: {user_exam_id})")
-    
+
+    transaction.set(user_ref, {'next_exam_id': user_exam_id}, merge=True)
+    transaction.set(user_ref.collection('exams').document(str(user_exam_id)), exam_data)
+
+    return user_exam_id
+
+
+def add_exam(user_id: int, title: str, exam_datetime_iso: str) -> int:
+    """Add exam and return per-user exam ID."""
+    db = get_firestore()
+
+    # A counter on the user doc replaces the old scan over every exam:
+    # 1 read + 2 writes regardless of how many exams the user has
+    user_ref = _user_ref(user_id)
+    user_exam_id = _add_exam_txn(db.transaction(), user_ref, user_id, title, exam_datetime_iso)
+    logger.info("Added exam for user %s: %s (ID: %s)", user_id, title, user_exam_id)
+
     return user_exam_id
 
 
 def get_user_exams(user_id: int) -> List[Dict[str, Any]]:
     """Get all exams for a user ordered by exam date."""
-    db = get_firestore()
     exams = []
-    
-    docs = db.collection('users').document(str(user_id)).collection('exams').order_by('exam_datetime_iso').stream()
-    
+
+    # Project only the fields callers render, cutting payload per doc
+    docs = (
+        _user_ref(user_id).collection('exams')
+        .select(['user_id', 'user_exam_id', 'title', 'exam_datetime_iso'])
+        .stream()
+    )
+
     for doc in docs:
         exam = doc.to_dict()
         exam['id'] = doc.id  # Add document ID
         exams.append(exam)
-    
+
+    # ISO strings sort lexicographically, so sorting the handful of exams
+    # a user has locally is cheaper than a server-side order_by (which
+    # needs a single-field index and adds query latency)
+    exams.sort(key=lambda exam: exam['exam_datetime_iso'])
     return exams
 
 
@@ -144,24 +177,81 @@ def get_all_users() -> List[Dict[str, Any]]:
     return users
 
 
+def iter_all_users(chunk_size: int = 500):
+    """Yield lists of users as they stream from Firestore.
+
+    Keeps memory at O(chunk_size) instead of materializing every user
+    before the caller can start working.
+    """
+    db = get_firestore()
+    chunk: List[Dict[str, Any]] = []
+    for doc in db.collection('users').stream():
+        chunk.append(doc.to_dict())
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def get_all_exams() -> List[Dict[str, Any]]:
+    """Get every exam across all users in one collection-group query.
+
+    Replaces a per-user subcollection fetch (N+1 reads) with a single
+    streamed query; callers group by user_id client-side.
+    """
+    db = get_firestore()
+    exams = []
+
+    docs = (
+        db.collection_group('exams')
+        .select(['user_id', 'user_exam_id', 'title', 'exam_datetime_iso'])
+        .stream()
+    )
+
+    for doc in docs:
+        exam = doc.to_dict()
+        exam['id'] = doc.id
+        exams.append(exam)
+
+    return exams
+
+
 def delete_exam(user_exam_id: int, user_id: int) -> bool:
     """Delete an exam."""
+    try:
+        _user_ref(user_id).collection('exams').document(str(user_exam_id)).delete()
+        logger.info("Deleted exam %s for user %s", user_exam_id, user_id)
+        return True
+    except Exception as e:
+        logger.error("Error deleting exam: %s", e)
+        return False
+
+
+def delete_exams_bulk(user_id: int, user_exam_ids: List[int]) -> bool:
+    """Delete several exams in one batched write."""
+    if not user_exam_ids:
+        return True
+
     db = get_firestore()
-    
+
     try:
-        db.collection('users').document(str(user_id)).collection('exams').document(str(user_exam_id)).delete()
-        logger.info(f"Deleted exam {user_exam_id} for user {user_id}")
+        exams_ref = _user_ref(user_id).collection('exams')
+        # One WriteBatch commit instead of a delete RPC per exam
+        batch = db.batch()
+        for user_exam_id in user_exam_ids:
+            batch.delete(exams_ref.document(str(user_exam_id)))
+        batch.commit()
+        logger.info("Deleted %s exams for user %s", len(user_exam_ids), user_id)
         return True
     except Exception as e:
-        logger.error(f"Error deleting exam: {e}")
+        logger.error("Error bulk-deleting exams: %s", e)
         return False
 
 
 def get_exam_by_id(user_exam_id: int, user_id: int) -> Optional[Dict[str, Any]]:
     """Get a specific exam by per-user ID."""
-    db = get_firestore()
-    
-    doc = db.collection('users').document(str(user_id)).collection('exams').document(str(user_exam_id)).get()
+    doc = _user_ref(user_id).collection('exams').document(str(user_exam_id)).get()
     
     if doc.exists:
         exam = doc.to_dict()
@@ -173,26 +263,24 @@ def get_exam_by_id(user_exam_id: int, user_id: int) -> Optional[Dict[str, Any]]:
 
 def update_exam(user_exam_id: int, user_id: int, title: str = None, exam_datetime_iso: str = None) -> bool:
     """Update an exam's title and/or datetime."""
-    db = get_firestore()
-    
+    update_data = {}
+    if title is not None:
+        update_data['title'] = title
+    if exam_datetime_iso is not None:
+        update_data['exam_datetime_iso'] = exam_datetime_iso
+
+    if not update_data:
+        return True
+
     try:
-        exam_ref = db.collection('users').document(str(user_id)).collection('exams').document(str(user_exam_id))
-        doc = exam_ref.get()
-        
-        if not doc.exists:
-            return False
-        
-        update_data = {}
-        if title is not None:
-            update_data['title'] = title
-        if exam_datetime_iso is not None:
-            update_data['exam_datetime_iso'] = exam_datetime_iso
-        
-        if update_data:
-            exam_ref.update(update_data)
-            logger.info(f"Updated exam {user_exam_id} for user {user_id}: {update_data}")
-        
+        exam_ref = _user_ref(user_id).collection('exams').document(str(user_exam_id))
+        # update() enforces existence server-side, so no read-before-write:
+        # a missing document raises NotFound in a single round-trip
+        exam_ref.update(update_data)
+        logger.info("Updated exam %s for user %s: %s", user_exam_id, user_id, update_data)
         return True
+    except NotFound:
+        return False
     except Exception as e:
-        logger.error(f"Error updating exam: {e}")
+        logger.error("Error updating exam: %s", e)
         return False
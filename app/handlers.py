@@ -2,7 +2,10 @@
 
 import logging
 import asyncio
+import time
+from collections import defaultdict
 from datetime import datetime
+from functools import wraps
 from telegram import Update
 from telegram.ext import ContextTypes
 from app import db
@@ -10,19 +13,161 @@ from app.config import Config
 from app.utils import (
     parse_exam_datetime,
     parse_time,
-    validate_timezone,
+    canonical_timezone,
     format_exam_countdown,
-    get_upcoming_exams_message
+    get_upcoming_exams_message,
+    iso_display,
+    user_today
 )
 from app.keyboards import get_main_menu_keyboard, get_exam_list_inline_keyboard
-from app.scheduler import reschedule_user_reminder, ensure_user_scheduled
+from app.scheduler import schedule_user_reminder, ensure_user_scheduled
 
 logger = logging.getLogger(__name__)
 
+# Snapshot the admin id once; it never changes after startup
+_ADMIN_ID = Config.ADMIN_ID
+
+# Broadcast fan-out: keep this many sends in flight, paced to Telegram's
+# global limit of ~30 messages/second per bot
+_BROADCAST_CONCURRENCY = 30
+_BROADCAST_RATE = 30.0
+
+# Shared per-exam line template for the list/delete views
+_EXAM_LINE_TMPL = "🆔 {uid}: {title}\n   📅 {dt}\n   ⏳ {cd}\n"
+
+# Static reply texts built once at import instead of re-concatenated on
+# every command
+_WELCOME_TEXT = (
+    "👋 Welcome to Exam Countdown Bot!\n\n"
+    "I'll help you track your exams and send daily reminders.\n\n"
+    "Use the menu buttons below to get started! 👇"
+)
+
+_HELP_TEXT = (
+    "ℹ️ **Exam Countdown Bot Help**\n\n"
+    "**Menu Buttons:**\n"
+    "• ➕ Add Exam - Add a new exam with title and date\n"
+    "• 📋 List Exams - View all your exams\n"
+    "• 🗑 Delete Exam - Remove an exam\n"
+    "• ⏰ Set Daily Time - Change notification time (HH:MM)\n"
+    "• 🌍 Set Timezone - Set your timezone (e.g., Europe/Rome)\n"
+    "• ℹ️ Help - Show this message\n\n"
+    "**Commands:**\n"
+    "/start - Start the bot\n"
+    "/menu - Show menu keyboard\n"
+    "/add <title> | <date> - Quick add exam\n"
+    "/list - List all exams\n"
+    "/delete <id> - Delete exam by ID\n"
+    "/settime <HH:MM> - Set notification time\n"
+    "/timezone <tz> - Set timezone\n"
+    "/help - Show help\n\n"
+    "**Date Formats:**\n"
+    "• YYYY-MM-DD (defaults to 09:00)\n"
+    "• YYYY-MM-DD HH:MM\n\n"
+    "Example: 2026-01-15 14:30"
+)
+
+_ADD_USAGE = (
+    "⚠️ Usage: /add <title> | <date>\n\n"
+    "Example: /add Math Final | 2026-01-15 14:00\n\n"
+    "Or use the ➕ Add Exam button for guided input."
+)
+
+_DELETE_USAGE = (
+    "⚠️ Usage: /delete <exam_id>\n\n"
+    "Example: /delete 1\n\n"
+    "Use /list to see exam IDs or tap 🗑 Delete Exam button."
+)
+
+_BROADCAST_USAGE = (
+    "📢 **Broadcast Message**\n\n"
+    "Usage: `/broadcast Your message here`\n\n"
+    "This will send the message to ALL users."
+)
+
+_SETTIME_USAGE = (
+    "⏰ **Set Daily Notification Time**\n\n"
+    "Usage: /settime <HH:MM>\n\n"
+    "Example: /settime 09:00\n\n"
+    "Or just send the time in HH:MM format."
+)
+
+_SET_TIME_PROMPT = (
+    "⏰ **Set Daily Notification Time**\n\n"
+    "Please send your preferred time in HH:MM format.\n\n"
+    "Example: 09:00 or 14:30"
+)
+
+_TIMEZONE_USAGE = (
+    "🌍 **Set Your Timezone**\n\n"
+    "Usage: /timezone <IANA_timezone>\n\n"
+    "Examples:\n"
+    "• /timezone Europe/Rome\n"
+    "• /timezone America/New_York\n"
+    "• /timezone Asia/Tokyo\n\n"
+    "Or just send the timezone name."
+)
+
+_SET_TIMEZONE_PROMPT = (
+    "🌍 **Set Your Timezone**\n\n"
+    "Please send your timezone using IANA format.\n\n"
+    "Examples:\n"
+    "• Europe/Rome\n"
+    "• America/New_York\n"
+    "• Asia/Tokyo\n"
+    "• UTC"
+)
+
+
+# Per-chat locks for handlers registered with block=False: work from
+# different chats overlaps freely, while two rapid taps from the same
+# chat still run in order
+_chat_locks = defaultdict(asyncio.Lock)
+
+
+def per_chat(handler):
+    """Serialize a non-blocking handler per chat."""
+    @wraps(handler)
+    async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE):
+        async with _chat_locks[update.effective_user.id]:
+            return await handler(update, context)
+    return wrapped
+
 
 def is_admin(user_id: int) -> bool:
     """Check if user is admin."""
-    return user_id == Config.ADMIN_ID
+    return user_id == _ADMIN_ID
+
+
+def _job_next_run(job, default: str = 'N/A') -> str:
+    """Format a job's next run time, tolerating both job-queue APIs."""
+    try:
+        next_run = getattr(job, 'next_t', None) or getattr(job.job, 'next_run_time', None)
+        if next_run:
+            # isoformat is several times faster than an equivalent strftime
+            return f"{next_run.isoformat(sep=' ', timespec='seconds')} {next_run.tzname() or ''}"
+    except Exception:
+        pass
+    return default
+
+
+def _render_exam_list(exams: list, timezone: str, header: str,
+                      limit: int = None, bold: bool = False) -> str:
+    """Build the exam-list message used by the list and delete views."""
+    today = user_today(timezone)
+    rows = exams if limit is None else exams[:limit]
+    lines = [header]
+    for exam in rows:
+        countdown_msg, _ = format_exam_countdown(
+            exam['exam_datetime_iso'], timezone, today
+        )
+        lines.append(_EXAM_LINE_TMPL.format(
+            uid=exam['user_exam_id'],
+            title=f"**{exam['title']}**" if bold else exam['title'],
+            dt=iso_display(exam['exam_datetime_iso']),
+            cd=countdown_msg
+        ))
+    return '\n'.join(lines)
 
 
 async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -30,22 +175,17 @@ async def cmd_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
     first_name = update.effective_user.first_name
     username = update.effective_user.username
-    user = db.get_or_create_user(user_id, first_name, username)
-    
-    # Schedule daily reminder for this user
-    reschedule_user_reminder(context.application, user_id)
-    
-    welcome_text = (
-        f"👋 Welcome to Exam Countdown Bot!\n\n"
-        f"I'll help you track your exams and send daily reminders.\n\n"
-        f"Use the menu buttons below to get started! 👇"
-    )
+    user = await db.run_db(db.get_or_create_user, user_id, first_name, username)
+
+    # Schedule daily reminder for this user (schedule comes from the row
+    # just fetched, so no second read on the event loop)
+    schedule_user_reminder(context.application, user_id, user['notify_time'], user['timezone'])
     
     await update.message.reply_text(
-        welcome_text,
+        _WELCOME_TEXT,
         reply_markup=get_main_menu_keyboard(is_admin(user_id))
     )
-    logger.info(f"User {user_id} ({first_name}) started the bot")
+    logger.info("User %s (%s) started the bot", user_id, first_name)
 
 
 async def cmd_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -60,7 +200,7 @@ async def cmd_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def cmd_debug(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /debug command - show scheduler status."""
     user_id = update.effective_user.id
-    user = db.get_or_create_user(user_id)
+    user = await db.run_db(db.get_or_create_user, user_id)
     
     # Get job queue info
     job_queue = context.application.job_queue
@@ -72,19 +212,14 @@ async def cmd_debug(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         f"👤 User ID: `{user_id}`",
         f"🌍 Timezone: `{user['timezone']}`",
         f"⏰ Notify Time: `{user['notify_time']}`",
-        f"🕐 Server Time: `{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}`",
+        f"🕐 Server Time: `{datetime.now().isoformat(sep=' ', timespec='seconds')}`",
         f"\n📋 **Scheduled Jobs:** {len(jobs)}",
     ]
     
     for job in jobs:
-        try:
-            next_run = getattr(job, 'next_t', None) or getattr(job.job, 'next_run_time', None)
-            next_run_str = next_run.strftime('%Y-%m-%d %H:%M:%S %Z') if next_run else 'N/A'
-        except Exception:
-            next_run_str = 'N/A'
         lines.append(f"  • Job: `{job.name}`")
-        lines.append(f"    Next run: `{next_run_str}`")
-    
+        lines.append(f"    Next run: `{_job_next_run(job)}`")
+
     if not jobs:
         lines.append("  ⚠️ No jobs scheduled for you!")
         lines.append("  Use /schedule to create one")
@@ -98,11 +233,11 @@ async def cmd_debug(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def cmd_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /schedule command - force create a scheduled job."""
     user_id = update.effective_user.id
-    user = db.get_or_create_user(user_id)
+    user = await db.run_db(db.get_or_create_user, user_id)
     
     # Force reschedule
     try:
-        reschedule_user_reminder(context.application, user_id)
+        schedule_user_reminder(context.application, user_id, user['notify_time'], user['timezone'])
         
         # Verify it was created
         job_queue = context.application.job_queue
@@ -110,12 +245,7 @@ async def cmd_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         jobs = job_queue.get_jobs_by_name(job_name) if job_queue else []
         
         if jobs:
-            job = jobs[0]
-            try:
-                next_run = getattr(job, 'next_t', None) or getattr(job.job, 'next_run_time', None)
-                next_run_str = next_run.strftime('%Y-%m-%d %H:%M:%S %Z') if next_run else 'Scheduled'
-            except Exception:
-                next_run_str = 'Scheduled'
+            next_run_str = _job_next_run(jobs[0], default='Scheduled')
             await update.message.reply_text(
                 f"✅ **Notification scheduled!**\n\n"
                 f"⏰ Time: `{user['notify_time']}`\n"
@@ -128,7 +258,7 @@ async def cmd_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
                 "❌ Failed to create job. Job queue might not be available."
             )
     except Exception as e:
-        logger.error(f"Error scheduling for user {user_id}: {e}", exc_info=True)
+        logger.error("Error scheduling for user %s: %s", user_id, e, exc_info=True)
         await update.message.reply_text(
             f"❌ Error: {str(e)}"
         )
@@ -136,32 +266,8 @@ async def cmd_schedule(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /help command and Help button."""
-    help_text = (
-        "ℹ️ **Exam Countdown Bot Help**\n\n"
-        "**Menu Buttons:**\n"
-        "• ➕ Add Exam - Add a new exam with title and date\n"
-        "• 📋 List Exams - View all your exams\n"
-        "• 🗑 Delete Exam - Remove an exam\n"
-        "• ⏰ Set Daily Time - Change notification time (HH:MM)\n"
-        "• 🌍 Set Timezone - Set your timezone (e.g., Europe/Rome)\n"
-        "• ℹ️ Help - Show this message\n\n"
-        "**Commands:**\n"
-        "/start - Start the bot\n"
-        "/menu - Show menu keyboard\n"
-        "/add <title> | <date> - Quick add exam\n"
-        "/list - List all exams\n"
-        "/delete <id> - Delete exam by ID\n"
-        "/settime <HH:MM> - Set notification time\n"
-        "/timezone <tz> - Set timezone\n"
-        "/help - Show help\n\n"
-        "**Date Formats:**\n"
-        "• YYYY-MM-DD (defaults to 09:00)\n"
-        "• YYYY-MM-DD HH:MM\n\n"
-        "Example: 2026-01-15 14:30"
-    )
-    
     await update.message.reply_text(
-        help_text,
+        _HELP_TEXT,
         parse_mode='Markdown'
     )
 
@@ -169,29 +275,27 @@ async def cmd_help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 async def cmd_add(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /add command with arguments."""
     user_id = update.effective_user.id
-    db.get_or_create_user(user_id)
-    
+    # Only the row's existence matters here; skip the read-back
+    await db.run_db(db.touch_user, user_id)
+
     # Parse arguments
     if not context.args:
-        await update.message.reply_text(
-            "⚠️ Usage: /add <title> | <date>\n\n"
-            "Example: /add Math Final | 2026-01-15 14:00\n\n"
-            "Or use the ➕ Add Exam button for guided input."
-        )
+        await update.message.reply_text(_ADD_USAGE)
         return
     
     full_text = ' '.join(context.args)
-    
-    if '|' not in full_text:
+
+    # partition splits on the first | in a single scan
+    title, sep, date_str = full_text.partition('|')
+    if not sep:
         await update.message.reply_text(
             "⚠️ Please separate title and date with | (pipe)\n\n"
             "Example: /add Math Final | 2026-01-15 14:00"
         )
         return
-    
-    parts = full_text.split('|', 1)
-    title = parts[0].strip()
-    date_str = parts[1].strip()
+
+    title = title.strip()
+    date_str = date_str.strip()
     
     if not title:
         await update.message.reply_text("⚠️ Title cannot be empty!")
@@ -209,26 +313,25 @@ async def cmd_add(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         return
     
     # Save to database
-        exam_id = db.add_exam(user_id, title, exam_datetime_iso)
-    
+    exam_id = await db.run_db(db.add_exam, user_id, title, exam_datetime_iso)
+
     await update.message.reply_text(
         f"✅ Exam added successfully!\n\n"
         f"📚 {title}\n"
-        f"📅 {exam_datetime_iso.replace('T', ' ')}\n"
-            f"🆔 ID: {exam_id}"
+        f"📅 {iso_display(exam_datetime_iso)}\n"
+        f"🆔 ID: {exam_id}"
     )
     
-    logger.info(f"User {user_id} added exam via command: {title}")
+    logger.info("User %s added exam via command: %s", user_id, title)
 
 
 async def cmd_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /list command and List Exams button."""
     user_id = update.effective_user.id
-    user = db.get_or_create_user(user_id)
-    exams = db.get_user_exams(user_id)
+    user, exams = await db.run_db(db.get_user_with_exams, user_id)
     
     # Ensure user has a scheduled job (in case Heroku dyno restarted)
-    ensure_user_scheduled(context.application, user_id)
+    ensure_user_scheduled(context.application, user_id, user['notify_time'], user['timezone'])
     
     if not exams:
         await update.message.reply_text(
@@ -238,20 +341,8 @@ async def cmd_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         return
     
     # Build message
-    lines = ["📋 **Your Exams:**\n"]
-    for exam in exams:
-        countdown_msg, days = format_exam_countdown(
-            exam['exam_datetime_iso'],
-            user['timezone']
-        )
-        lines.append(
-            f"🆔 {exam['user_exam_id']}: **{exam['title']}**\n"
-            f"   📅 {exam['exam_datetime_iso'].replace('T', ' ')}\n"
-            f"   ⏳ {countdown_msg}\n"
-        )
-    
-    message_text = '\n'.join(lines)
-    
+    message_text = _render_exam_list(exams, user['timezone'], "📋 **Your Exams:**\n", bold=True)
+
     # Add inline keyboard
     keyboard = get_exam_list_inline_keyboard(exams, show_delete_buttons=False)
     
@@ -267,11 +358,7 @@ async def cmd_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
     user_id = update.effective_user.id
     
     if not context.args:
-        await update.message.reply_text(
-            "⚠️ Usage: /delete <exam_id>\n\n"
-            "Example: /delete 1\n\n"
-            "Use /list to see exam IDs or tap 🗑 Delete Exam button."
-        )
+        await update.message.reply_text(_DELETE_USAGE)
         return
     
     try:
@@ -281,11 +368,11 @@ async def cmd_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         return
     
     # Delete exam
-    success = db.delete_exam(exam_id, user_id)
+    success = await db.run_db(db.delete_exam, exam_id, user_id)
     
     if success:
         await update.message.reply_text(f"✅ Exam #{exam_id} deleted successfully!")
-        logger.info(f"User {user_id} deleted exam {exam_id}")
+        logger.info("User %s deleted exam %s", user_id, exam_id)
     else:
         await update.message.reply_text(
             f"⚠️ Exam #{exam_id} not found or doesn't belong to you."
@@ -295,8 +382,7 @@ async def cmd_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
 async def btn_delete_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle Delete Exam button - show list with delete buttons."""
     user_id = update.effective_user.id
-    user = db.get_or_create_user(user_id)
-    exams = db.get_user_exams(user_id)
+    user, exams = await db.run_db(db.get_user_with_exams, user_id)
     
     if not exams:
         await update.message.reply_text(
@@ -305,21 +391,9 @@ async def btn_delete_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         )
         return
     
-    # Build message
-    lines = ["🗑 **Select exam to delete:**\n"]
-    for exam in exams[:10]:  # Show first 10
-        countdown_msg, _ = format_exam_countdown(
-            exam['exam_datetime_iso'],
-            user['timezone']
-        )
-        lines.append(
-            f"🆔 {exam['user_exam_id']}: {exam['title']}\n"
-            f"   📅 {exam['exam_datetime_iso'].replace('T', ' ')}\n"
-            f"   ⏳ {countdown_msg}\n"
-        )
-    
-    message_text = '\n'.join(lines)
-    
+    # Build message (first 10 exams)
+    message_text = _render_exam_list(exams, user['timezone'], "🗑 **Select exam to delete:**\n", limit=10)
+
     # Add inline keyboard with delete buttons
     keyboard = get_exam_list_inline_keyboard(exams, show_delete_buttons=True)
     
@@ -333,15 +407,9 @@ async def btn_delete_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 async def cmd_settime(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /settime command and Set Daily Time button."""
     user_id = update.effective_user.id
-    db.get_or_create_user(user_id)
-    
+
     if not context.args:
-        await update.message.reply_text(
-            "⏰ **Set Daily Notification Time**\n\n"
-            "Usage: /settime <HH:MM>\n\n"
-            "Example: /settime 09:00\n\n"
-            "Or just send the time in HH:MM format."
-        )
+        await update.message.reply_text(_SETTIME_USAGE)
         return
     
     time_str = context.args[0]
@@ -354,91 +422,78 @@ async def cmd_settime(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         )
         return
     
-    # Update in database
-    db.update_user_notify_time(user_id, normalized_time)
-    
-    # Reschedule reminder
-    reschedule_user_reminder(context.application, user_id)
-    
+    # Skip the write and reschedule when nothing changed (repeated sends
+    # of the same time are answered from the user cache)
+    user = await db.run_db(db.get_or_create_user, user_id)
+    if user.get('notify_time') != normalized_time:
+        await db.run_db(db.update_user_notify_time, user_id, normalized_time)
+        schedule_user_reminder(context.application, user_id, normalized_time, user['timezone'])
+
     await update.message.reply_text(
         f"✅ Daily notification time set to {normalized_time}!"
     )
     
-    logger.info(f"User {user_id} set notification time to {normalized_time}")
+    logger.info("User %s set notification time to %s", user_id, normalized_time)
 
 
 async def btn_set_time(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle Set Daily Time button."""
-    await update.message.reply_text(
-        "⏰ **Set Daily Notification Time**\n\n"
-        "Please send your preferred time in HH:MM format.\n\n"
-        "Example: 09:00 or 14:30"
-    )
+    await update.message.reply_text(_SET_TIME_PROMPT)
 
 
 async def cmd_timezone(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /timezone command and Set Timezone button."""
     user_id = update.effective_user.id
-    db.get_or_create_user(user_id)
-    
+
     if not context.args:
-        await update.message.reply_text(
-            "🌍 **Set Your Timezone**\n\n"
-            "Usage: /timezone <IANA_timezone>\n\n"
-            "Examples:\n"
-            "• /timezone Europe/Rome\n"
-            "• /timezone America/New_York\n"
-            "• /timezone Asia/Tokyo\n\n"
-            "Or just send the timezone name."
-        )
+        await update.message.reply_text(_TIMEZONE_USAGE)
         return
     
-    tz_str = context.args[0]
-    
-    if not validate_timezone(tz_str):
+    # Store the canonical IANA name so the scheduler can resolve it
+    # with ZoneInfo directly
+    tz_str = canonical_timezone(context.args[0])
+
+    if tz_str is None:
         await update.message.reply_text(
             "⚠️ Invalid timezone!\n\n"
             "Please use a valid IANA timezone.\n"
             "Examples: Europe/Rome, America/New_York, Asia/Tokyo"
         )
         return
-    
-    # Update in database
-    db.update_user_timezone(user_id, tz_str)
-    
-    # Reschedule reminder
-    reschedule_user_reminder(context.application, user_id)
-    
+
+    # Skip the write and reschedule when nothing changed
+    user = await db.run_db(db.get_or_create_user, user_id)
+    if user.get('timezone') != tz_str:
+        await db.run_db(db.update_user_timezone, user_id, tz_str)
+        schedule_user_reminder(context.application, user_id, user['notify_time'], tz_str)
+
     await update.message.reply_text(
         f"✅ Timezone set to {tz_str}!"
     )
     
-    logger.info(f"User {user_id} set timezone to {tz_str}")
+    logger.info("User %s set timezone to %s", user_id, tz_str)
 
 
 async def btn_set_timezone(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle Set Timezone button."""
-    await update.message.reply_text(
-        "🌍 **Set Your Timezone**\n\n"
-        "Please send your timezone using IANA format.\n\n"
-        "Examples:\n"
-        "• Europe/Rome\n"
-        "• America/New_York\n"
-        "• Asia/Tokyo\n"
-        "• UTC"
-    )
+    await update.message.reply_text(_SET_TIMEZONE_PROMPT)
 
 
 # Inline callback handlers
+@per_chat
 async def callback_refresh_list(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle 'Refresh' inline button callback."""
     query = update.callback_query
-    await query.answer("Refreshing...")
-    
+    # Overlap the callback acknowledgement with the DB read
+    answer_task = asyncio.create_task(query.answer("Refreshing..."))
+
     user_id = update.effective_user.id
-    user = db.get_or_create_user(user_id)
-    exams = db.get_user_exams(user_id)
-    
+    # finally keeps the answer awaited even when the DB read raises
+    try:
+        user, exams = await db.run_db(db.get_user_with_exams, user_id)
+    finally:
+        await answer_task
+
     if not exams:
         await query.edit_message_text(
             "📋 You have no exams yet.\n\n"
@@ -447,20 +502,8 @@ async def callback_refresh_list(update: Update, context: ContextTypes.DEFAULT_TY
         return
     
     # Build message
-    lines = ["📋 **Your Exams:**\n"]
-    for exam in exams:
-        countdown_msg, days = format_exam_countdown(
-            exam['exam_datetime_iso'],
-            user['timezone']
-        )
-        lines.append(
-            f"🆔 {exam['user_exam_id']}: **{exam['title']}**\n"
-            f"   📅 {exam['exam_datetime_iso'].replace('T', ' ')}\n"
-            f"   ⏳ {countdown_msg}\n"
-        )
-    
-    message_text = '\n'.join(lines)
-    
+    message_text = _render_exam_list(exams, user['timezone'], "📋 **Your Exams:**\n", bold=True)
+
     # Update message
     keyboard = get_exam_list_inline_keyboard(exams, show_delete_buttons=False)
     
@@ -471,15 +514,20 @@ async def callback_refresh_list(update: Update, context: ContextTypes.DEFAULT_TY
     )
 
 
+@per_chat
 async def callback_notify_now(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle 'Notify Now' inline button callback."""
     query = update.callback_query
-    await query.answer("Sending notification...")
-    
+    # Overlap the callback acknowledgement with the DB read
+    answer_task = asyncio.create_task(query.answer("Sending notification..."))
+
     user_id = update.effective_user.id
-    user = db.get_or_create_user(user_id)
-    exams = db.get_user_exams(user_id)
-    
+    # finally keeps the answer awaited even when the DB read raises
+    try:
+        user, exams = await db.run_db(db.get_user_with_exams, user_id)
+    finally:
+        await answer_task
+
     # Generate message
     message = get_upcoming_exams_message(exams, user['timezone'])
     
@@ -488,7 +536,7 @@ async def callback_notify_now(update: Update, context: ContextTypes.DEFAULT_TYPE
             chat_id=user_id,
             text=message
         )
-        logger.info(f"Manual notification sent to user {user_id}")
+        logger.info("Manual notification sent to user %s", user_id)
     else:
         await context.bot.send_message(
             chat_id=user_id,
@@ -496,6 +544,7 @@ async def callback_notify_now(update: Update, context: ContextTypes.DEFAULT_TYPE
         )
 
 
+@per_chat
 async def callback_delete_exam(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle inline delete button callback."""
     query = update.callback_query
@@ -514,16 +563,20 @@ async def callback_delete_exam(update: Update, context: ContextTypes.DEFAULT_TYP
         return
     
     # Delete exam
-    success = db.delete_exam(exam_id, user_id)
+    success = await db.run_db(db.delete_exam, exam_id, user_id)
     
     if success:
-        await query.answer(f"Exam #{exam_id} deleted!")
-        logger.info(f"User {user_id} deleted exam {exam_id} via inline button")
-        
-        # Refresh the list
-        user = db.get_or_create_user(user_id)
-        exams = db.get_user_exams(user_id)
-        
+        # Overlap the confirmation toast with the list reload
+        answer_task = asyncio.create_task(query.answer(f"Exam #{exam_id} deleted!"))
+        logger.info("User %s deleted exam %s via inline button", user_id, exam_id)
+
+        # Refresh the list; finally keeps the toast awaited even when
+        # the DB read raises
+        try:
+            user, exams = await db.run_db(db.get_user_with_exams, user_id)
+        finally:
+            await answer_task
+
         if not exams:
             await query.edit_message_text(
                 "✅ Exam deleted!\n\n"
@@ -532,19 +585,11 @@ async def callback_delete_exam(update: Update, context: ContextTypes.DEFAULT_TYP
             return
         
         # Build updated message
-        lines = ["✅ Exam deleted!\n\n🗑 **Select exam to delete:**\n"]
-        for exam in exams[:10]:
-            countdown_msg, _ = format_exam_countdown(
-                exam['exam_datetime_iso'],
-                user['timezone']
-            )
-            lines.append(
-                f"🆔 {exam['user_exam_id']}: {exam['title']}\n"
-                f"   📅 {exam['exam_datetime_iso'].replace('T', ' ')}\n"
-                f"   ⏳ {countdown_msg}\n"
-            )
-        
-        message_text = '\n'.join(lines)
+        message_text = _render_exam_list(
+            exams, user['timezone'],
+            "✅ Exam deleted!\n\n🗑 **Select exam to delete:**\n",
+            limit=10
+        )
         keyboard = get_exam_list_inline_keyboard(exams, show_delete_buttons=True)
         
         await query.edit_message_text(
@@ -557,49 +602,64 @@ async def callback_delete_exam(update: Update, context: ContextTypes.DEFAULT_TYP
 
 
 # Handler for time input after button press
-async def handle_time_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle time input when user is setting notification time."""
+async def handle_time_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+    """Handle time input when user is setting notification time.
+
+    Returns True if the message was consumed as a time input.
+    """
     text = update.message.text.strip()
     
     # Check if it's a valid time format
     normalized_time = parse_time(text)
     if normalized_time:
         user_id = update.effective_user.id
-        db.update_user_notify_time(user_id, normalized_time)
-        
-        try:
-            reschedule_user_reminder(context.application, user_id)
-            logger.info(f"User {user_id} rescheduled notification to {normalized_time}")
-        except Exception as e:
-            logger.error(f"Failed to reschedule for user {user_id}: {e}")
-        
+        # Only write and reschedule when the time actually changed
+        user = await db.run_db(db.get_or_create_user, user_id)
+        if user.get('notify_time') != normalized_time:
+            await db.run_db(db.update_user_notify_time, user_id, normalized_time)
+
+            try:
+                schedule_user_reminder(context.application, user_id, normalized_time, user['timezone'])
+                logger.info("User %s rescheduled notification to %s", user_id, normalized_time)
+            except Exception as e:
+                logger.error("Failed to reschedule for user %s: %s", user_id, e)
+
         await update.message.reply_text(
             f"✅ Daily notification time set to {normalized_time}!",
             reply_markup=get_main_menu_keyboard(is_admin(user_id))
         )
-        logger.info(f"User {user_id} set notification time to {normalized_time}")
-        return
+        logger.info("User %s set notification time to %s", user_id, normalized_time)
+        return True
+    return False
 
 
 # Handler for timezone input after button press
-async def handle_timezone_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle timezone input when user is setting timezone."""
-    text = update.message.text.strip()
-    
-    # Check if it's a valid timezone
-    if validate_timezone(text):
+async def handle_timezone_input(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+    """Handle timezone input when user is setting timezone.
+
+    Returns True if the message was consumed as a timezone input.
+    """
+    # Canonicalize here so the stored name resolves via ZoneInfo later
+    text = canonical_timezone(update.message.text.strip())
+
+    if text is not None:
         user_id = update.effective_user.id
-        db.update_user_timezone(user_id, text)
-        reschedule_user_reminder(context.application, user_id)
-        
+        # Only write and reschedule when the timezone actually changed
+        user = await db.run_db(db.get_or_create_user, user_id)
+        if user.get('timezone') != text:
+            await db.run_db(db.update_user_timezone, user_id, text)
+            schedule_user_reminder(context.application, user_id, user['notify_time'], text)
+
         await update.message.reply_text(
             f"✅ Timezone set to {text}!",
             reply_markup=get_main_menu_keyboard(is_admin(user_id))
         )
-        logger.info(f"User {user_id} set timezone to {text}")
-        return
+        logger.info("User %s set timezone to %s", user_id, text)
+        return True
+    return False
 
 
+@per_chat
 async def cmd_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """
     Handle /broadcast command - Send a message to all users.
@@ -614,57 +674,81 @@ async def cmd_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     
     # Check if message is provided
     if not context.args:
-        await update.message.reply_text(
-            "📢 **Broadcast Message**\n\n"
-            "Usage: `/broadcast Your message here`\n\n"
-            "This will send the message to ALL users.",
-            parse_mode='Markdown'
-        )
+        await update.message.reply_text(_BROADCAST_USAGE, parse_mode='Markdown')
         return
     
     # Get the message
     message_text = ' '.join(context.args)
     
-    # Get all users
-    users = db.get_all_users()
-    
-    if not users:
-        await update.message.reply_text("⚠️ No users found in database.")
-        return
-    
     # Send status message
-    status_msg = await update.message.reply_text(
-        f"📤 Sending message to {len(users)} users..."
-    )
-    
-    # Send to all users
+    status_msg = await update.message.reply_text("📤 Broadcasting message...")
+
+    # Stream users from the DB in chunks into a bounded queue consumed by
+    # a pool of sender tasks, so sending starts before the user table is
+    # fully read and memory stays O(chunk). A token bucket hands out one
+    # send slot every 1/rate seconds across all consumers.
+    broadcast_text = f"📢 **Announcement**\n\n{message_text}"
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * _BROADCAST_CONCURRENCY)
     success_count = 0
     fail_count = 0
-    
-    for user in users:
-        try:
-            await context.bot.send_message(
-                chat_id=user['user_id'],
-                text=f"📢 **Announcement**\n\n{message_text}",
-                parse_mode='Markdown'
-            )
-            success_count += 1
-            # Small delay to avoid rate limiting
-            await asyncio.sleep(0.05)
-        except Exception as e:
-            fail_count += 1
-            logger.warning(f"Failed to send broadcast to {user['user_id']}: {e}")
-    
+    pace_lock = asyncio.Lock()
+    next_slot = time.monotonic()
+
+    async def _send_one(chat_id: int) -> None:
+        nonlocal next_slot
+        async with pace_lock:
+            now = time.monotonic()
+            wait = next_slot - now
+            next_slot = max(next_slot, now) + 1.0 / _BROADCAST_RATE
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text=broadcast_text,
+            parse_mode='Markdown'
+        )
+
+    async def _consumer() -> None:
+        nonlocal success_count, fail_count
+        while True:
+            chat_id = await queue.get()
+            if chat_id is None:
+                return
+            try:
+                await _send_one(chat_id)
+                success_count += 1
+            except Exception as e:
+                fail_count += 1
+                logger.warning("Failed to send broadcast to %s: %s", chat_id, e)
+
+    consumers = [asyncio.create_task(_consumer()) for _ in range(_BROADCAST_CONCURRENCY)]
+    users_iter = db.iter_all_users()
+    while True:
+        # Each next() runs one chunk query in a worker thread
+        chunk = await db.run_db(next, users_iter, None)
+        if chunk is None:
+            break
+        for user in chunk:
+            await queue.put(user['user_id'])
+    for _ in consumers:
+        await queue.put(None)
+    await asyncio.gather(*consumers)
+
+    total = success_count + fail_count
+    if total == 0:
+        await status_msg.edit_text("⚠️ No users found in database.")
+        return
+
     # Update status
     await status_msg.edit_text(
         f"✅ **Broadcast Complete!**\n\n"
         f"📨 Sent: {success_count}\n"
         f"❌ Failed: {fail_count}\n"
-        f"👥 Total: {len(users)}",
+        f"👥 Total: {total}",
         parse_mode='Markdown'
     )
-    
-    logger.info(f"Admin {user_id} broadcasted message to {success_count}/{len(users)} users")
+
+    logger.info("Admin %s broadcasted message to %s/%s users", user_id, success_count, total)
 
 
 async def cmd_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -679,17 +763,16 @@ async def cmd_stats(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         await update.message.reply_text("⛔ This command is only available to the admin.")
         return
     
-    # Get all users
-    users = db.get_all_users()
-    
+    # Get all users with their exams in one query (no per-user round-trips)
+    users = await db.run_db(db.get_all_users_with_exams)
+
     # Count total exams
     total_exams = 0
     users_with_exams = 0
     for user in users:
-        exams = db.get_user_exams(user['user_id'])
-        if exams:
+        if user['exams']:
             users_with_exams += 1
-            total_exams += len(exams)
+            total_exams += len(user['exams'])
     
     # Build user list (last 10 users)
     user_list = ""
@@ -788,10 +871,10 @@ async def cmd_reply(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
             parse_mode='Markdown'
         )
         
-        logger.info(f"Admin {user_id} replied to user {target_user_id}")
+        logger.info("Admin %s replied to user %s", user_id, target_user_id)
         
     except Exception as e:
-        logger.error(f"Failed to send reply to user {target_user_id}: {e}")
+        logger.error("Failed to send reply to user %s: %s", target_user_id, e)
         await update.message.reply_text(
             f"❌ Failed to send message. User may have blocked the bot or user ID is invalid.\n\n"
             f"Error: {str(e)}"
@@ -870,10 +953,10 @@ async def handle_admin_reply(update: Update, context: ContextTypes.DEFAULT_TYPE)
             parse_mode='Markdown'
         )
         
-        logger.info(f"Admin {user_id} replied to user {target_user_id}")
+        logger.info("Admin %s replied to user %s", user_id, target_user_id)
         
     except Exception as e:
-        logger.error(f"Failed to send reply to user {target_user_id}: {e}")
+        logger.error("Failed to send reply to user %s: %s", target_user_id, e)
         await update.message.reply_text(
             f"❌ Failed to send message.\n\nError: {str(e)}"
         )
@@ -881,3 +964,24 @@ async def handle_admin_reply(update: Update, context: ContextTypes.DEFAULT_TYPE)
     # Clear reply mode
     context.user_data.pop('reply_to_user', None)
     return True
+
+
+# Single dispatch table for inline callbacks: one CallbackQueryHandler
+# resolves the prefix before ':' with a dict lookup instead of PTB
+# matching each registered pattern regex in turn
+_CB_TABLE = {
+    'refresh_list': callback_refresh_list,
+    'notify_now': callback_notify_now,
+    'del': callback_delete_exam,
+    'reply': callback_reply_button,
+}
+
+
+async def dispatch_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Route an inline callback to its handler by callback_data prefix."""
+    handler = _CB_TABLE.get(update.callback_query.data.partition(':')[0])
+    if handler is not None:
+        await handler(update, context)
+    else:
+        # Unknown (e.g. stale) button: acknowledge so the spinner stops
+        await update.callback_query.answer()
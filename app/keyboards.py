@@ -1,11 +1,14 @@
 """Keyboard layouts for the bot."""
 
+from functools import lru_cache
+
 from telegram import ReplyKeyboardMarkup, InlineKeyboardMarkup, InlineKeyboardButton
 from typing import List, Dict, Any
 
 
+@lru_cache(maxsize=2)
 def get_main_menu_keyboard(is_admin: bool = False) -> ReplyKeyboardMarkup:
-    """Get the main menu Reply Keyboard."""
+    """Get the main menu Reply Keyboard (cached; one variant per admin flag)."""
     keyboard = [
         ["➕ Add Exam", "📋 List Exams"],
         ["✏️ Edit Exam", "🗑 Delete Exam"],
@@ -25,38 +28,42 @@ def get_main_menu_keyboard(is_admin: bool = False) -> ReplyKeyboardMarkup:
     )
 
 
+# The Refresh/Notify Now row is identical on every render, and without
+# delete buttons so is the whole keyboard; build both once at import
+_ACTION_ROW = [
+    InlineKeyboardButton("🔄 Refresh", callback_data="refresh_list"),
+    InlineKeyboardButton("🔔 Notify Now", callback_data="notify_now")
+]
+_LIST_ONLY_KEYBOARD = InlineKeyboardMarkup([_ACTION_ROW])
+
+
 def get_exam_list_inline_keyboard(exams: List[Dict[str, Any]], show_delete_buttons: bool = False) -> InlineKeyboardMarkup:
     """
     Get inline keyboard for exam list.
-    
+
     Args:
         exams: List of exam dictionaries
         show_delete_buttons: If True, add delete button for each exam
     """
-    buttons = []
-    
+    if not show_delete_buttons or not exams:
+        return _LIST_ONLY_KEYBOARD
+
     # Add delete button for each exam (limit to first 10)
-    if show_delete_buttons and exams:
-        for exam in exams[:10]:
-            buttons.append([
-                InlineKeyboardButton(
-                    f"🗑 Delete #{exam['user_exam_id']} - {exam['title'][:30]}",
-                    callback_data=f"del:{exam['user_exam_id']}"
-                )
-            ])
-    
-    # Add action buttons
-    action_buttons = [
-        InlineKeyboardButton("🔄 Refresh", callback_data="refresh_list"),
-        InlineKeyboardButton("🔔 Notify Now", callback_data="notify_now")
+    buttons = [
+        [InlineKeyboardButton(
+            f"🗑 Delete #{exam['user_exam_id']} - {exam['title'][:30]}",
+            callback_data=f"del:{exam['user_exam_id']}"
+        )]
+        for exam in exams[:10]
     ]
-    buttons.append(action_buttons)
-    
+    buttons.append(_ACTION_ROW)
+
     return InlineKeyboardMarkup(buttons)
 
 
+@lru_cache(maxsize=1)
 def get_cancel_keyboard() -> ReplyKeyboardMarkup:
-    """Get a keyboard with just a cancel button."""
+    """Get a keyboard with just a cancel button (cached; it never changes)."""
     keyboard = [["❌ Cancel"]]
     return ReplyKeyboardMarkup(
         keyboard,
@@ -1,7 +1,10 @@
 """Main entry point for the Exam Countdown Bot."""
 
 import asyncio
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from telegram import Update
 from telegram.ext import (
@@ -35,10 +38,7 @@ from app.handlers import (
     btn_debug,
     btn_schedule,
     btn_stats,
-    callback_refresh_list,
-    callback_notify_now,
-    callback_delete_exam,
-    callback_reply_button,
+    dispatch_callback,
     handle_admin_reply,
     handle_time_input,
     handle_timezone_input
@@ -48,17 +48,103 @@ from app.feedback_handler import get_feedback_conversation_handler
 from app.edit_handler import get_edit_exam_conversation_handler
 from app.scheduler import schedule_all_users
 
-# Configure logging
+# Configure logging. Handlers that write to disk or the terminal run on
+# a listener thread; the event loop only enqueues records, so a slow
+# write never stalls update handling.
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(
+    _log_queue,
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('bot.log'),
+    respect_handler_level=True
+)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO,
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('bot.log')
-    ]
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
+# Menu button texts the free-text handler must leave to other handlers;
+# frozen once instead of rebuilding a list per message
+_MENU_BUTTONS = frozenset({
+    "➕ Add Exam", "📋 List Exams", "🗑 Delete Exam",
+    "⏰ Set Daily Time", "🌍 Set Timezone", "ℹ️ Help",
+    "💬 Feedback", "❌ Cancel", "📢 Broadcast",
+    "🔧 Debug", "📅 Schedule", "📊 Stats", "✏️ Edit Exam"
+})
+
+# Reply-keyboard buttons routed through one handler: a dict lookup on the
+# message text replaces eight anchored-regex handlers that PTB would try
+# one after another on every message.
+# "➕ Add Exam", "✏️ Edit Exam" and "💬 Feedback" stay with their
+# ConversationHandlers, which are registered first and win.
+_BUTTON_ROUTES = {
+    "📋 List Exams": cmd_list,
+    "🗑 Delete Exam": btn_delete_exam,
+    "⏰ Set Daily Time": btn_set_time,
+    "🌍 Set Timezone": btn_set_timezone,
+    "ℹ️ Help": cmd_help,
+    "📢 Broadcast": btn_broadcast,
+    "🔧 Debug": btn_debug,
+    "📅 Schedule": btn_schedule,
+    "📊 Stats": btn_stats,
+}
+
+
+async def dispatch_button(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Route a reply-keyboard button press to its handler."""
+    await _BUTTON_ROUTES[update.message.text](update, context)
+
+
+async def combined_text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle text input - check admin reply first, then time/timezone."""
+    # Skip menu button texts - let conversation handlers handle them
+    if update.message.text in _MENU_BUTTONS:
+        return
+
+    # Each stage returns True once it has consumed the message, so
+    # later stages don't run (or hit the DB) needlessly
+    if await handle_admin_reply(update, context):
+        return
+
+    if await handle_time_input(update, context):
+        return
+
+    await handle_timezone_input(update, context)
+
+
+# Registration tables looped over in main(): conversations first (so
+# their entry points win over the generic dispatchers), then commands,
+# then the message/callback dispatchers. Keeping the wiring as data
+# makes the handler graph readable in one place.
+_CONVERSATION_FACTORIES = (
+    get_add_exam_conversation_handler,   # Add Exam flow
+    get_edit_exam_conversation_handler,  # Edit Exam flow
+    get_feedback_conversation_handler,   # Feedback flow
+)
+
+# block=False on /broadcast lets other chats' updates dispatch while a
+# long broadcast runs; the per_chat lock keeps same-chat order
+_COMMAND_TABLE = (
+    ("start", cmd_start, {}),
+    ("menu", cmd_menu, {}),
+    ("help", cmd_help, {}),
+    ("add", cmd_add, {}),
+    ("list", cmd_list, {}),
+    ("delete", cmd_delete, {}),
+    ("settime", cmd_settime, {}),
+    ("timezone", cmd_timezone, {}),
+    ("debug", cmd_debug, {}),
+    ("schedule", cmd_schedule, {}),
+    ("broadcast", cmd_broadcast, {"block": False}),
+    ("stats", cmd_stats, {}),
+    ("reply", cmd_reply, {}),
+)
+
 
 def main() -> None:
     """Start the bot."""
@@ -70,117 +156,40 @@ def main() -> None:
         else:
             logger.info("Using SQLite database")
         
-        # Create application
-        application = Application.builder().token(Config.BOT_TOKEN).build()
-        
-        # Add conversation handler for Add Exam flow
-        application.add_handler(get_add_exam_conversation_handler())
-        
-        # Add conversation handler for Edit Exam flow
-        application.add_handler(get_edit_exam_conversation_handler())
-        
-        # Add conversation handler for Feedback flow
-        application.add_handler(get_feedback_conversation_handler())
+        # Create application. PTB's default HTTPX pool holds a single
+        # connection; concurrent sends (broadcast fan-out, non-blocking
+        # callbacks) would queue on it, so size the pool to match
+        application = (
+            Application.builder()
+            .token(Config.BOT_TOKEN)
+            .connection_pool_size(64)
+            .pool_timeout(30.0)
+            .build()
+        )
         
-        # Add command handlers
-        application.add_handler(CommandHandler("start", cmd_start))
-        application.add_handler(CommandHandler("menu", cmd_menu))
-        application.add_handler(CommandHandler("help", cmd_help))
-        application.add_handler(CommandHandler("add", cmd_add))
-        application.add_handler(CommandHandler("list", cmd_list))
-        application.add_handler(CommandHandler("delete", cmd_delete))
-        application.add_handler(CommandHandler("settime", cmd_settime))
-        application.add_handler(CommandHandler("timezone", cmd_timezone))
-        application.add_handler(CommandHandler("debug", cmd_debug))
-        application.add_handler(CommandHandler("schedule", cmd_schedule))
-        application.add_handler(CommandHandler("broadcast", cmd_broadcast))
-        application.add_handler(CommandHandler("stats", cmd_stats))
-        application.add_handler(CommandHandler("reply", cmd_reply))
-        
-        # Add button handlers (Reply Keyboard)
-        application.add_handler(MessageHandler(
-            filters.Regex("^📋 List Exams$"),
-            cmd_list
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex("^🗑 Delete Exam$"),
-            btn_delete_exam
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex("^⏰ Set Daily Time$"),
-            btn_set_time
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex("^🌍 Set Timezone$"),
-            btn_set_timezone
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex("^ℹ️ Help$"),
-            cmd_help
-        ))
+        # Register handlers from the module-level tables
+        for factory in _CONVERSATION_FACTORIES:
+            application.add_handler(factory())
+
+        for command, callback, kwargs in _COMMAND_TABLE:
+            application.add_handler(CommandHandler(command, callback, **kwargs))
+
+        # Reply-keyboard buttons: one set-filtered handler covers user and
+        # admin buttons via the _BUTTON_ROUTES lookup
         # Note: "💬 Feedback" is handled by get_feedback_conversation_handler()
-        
-        # Admin button handlers
-        application.add_handler(MessageHandler(
-            filters.Regex("^📢 Broadcast$"),
-            btn_broadcast
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex("^🔧 Debug$"),
-            btn_debug
-        ))
         application.add_handler(MessageHandler(
-            filters.Regex("^📅 Schedule$"),
-            btn_schedule
+            filters.Text(set(_BUTTON_ROUTES)),
+            dispatch_button
         ))
-        application.add_handler(MessageHandler(
-            filters.Regex("^📊 Stats$"),
-            btn_stats
-        ))
-        
-        # Add inline callback handlers
-        application.add_handler(CallbackQueryHandler(
-            callback_refresh_list,
-            pattern="^refresh_list$"
-        ))
-        application.add_handler(CallbackQueryHandler(
-            callback_notify_now,
-            pattern="^notify_now$"
-        ))
-        application.add_handler(CallbackQueryHandler(
-            callback_delete_exam,
-            pattern="^del:"
-        ))
-        application.add_handler(CallbackQueryHandler(
-            callback_reply_button,
-            pattern="^reply:"
-        ))
-        
-        # Add handler for admin reply (must be before other text handlers)
-        async def combined_text_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            """Handle text input - check admin reply first, then time/timezone."""
-            text = update.message.text
-            
-            # Skip menu button texts - let conversation handlers handle them
-            menu_buttons = [
-                "➕ Add Exam", "📋 List Exams", "🗑 Delete Exam",
-                "⏰ Set Daily Time", "🌍 Set Timezone", "ℹ️ Help",
-                "💬 Feedback", "❌ Cancel", "📢 Broadcast",
-                "🔧 Debug", "📅 Schedule", "📊 Stats", "✏️ Edit Exam"
-            ]
-            if text in menu_buttons:
-                return
-            
-            # First check if it's an admin reply
-            if await handle_admin_reply(update, context):
-                return
-            
-            # Then try time input
-            await handle_time_input(update, context)
-            
-            # Then try timezone input
-            await handle_timezone_input(update, context)
-        
+
+        # One dispatcher for all inline callbacks: the prefix lookup in
+        # handlers.dispatch_callback replaces four pattern regexes. The
+        # edit-flow callbacks stay inside their ConversationHandler, which
+        # is registered earlier and therefore wins while a conversation is
+        # active. Non-blocking; the slow callbacks hold per-chat locks.
+        application.add_handler(CallbackQueryHandler(dispatch_callback, block=False))
+
+        # Free-text input (admin reply, time, timezone) goes last
         application.add_handler(MessageHandler(
             filters.TEXT & ~filters.COMMAND,
             combined_text_handler
@@ -202,7 +211,20 @@ def main() -> None:
         print("Press Ctrl+C to stop the bot")
         print("="*50 + "\n")
         
-        application.run_polling(allowed_updates=["message", "callback_query"])
+        if Config.WEBHOOK_URL:
+            # Webhook mode: Telegram pushes updates and gets its HTTP 200
+            # as soon as the update is queued, so a slow handler never
+            # delays delivery the way it delays the next long-poll
+            logger.info(f"Using webhook: {Config.WEBHOOK_URL} (port {Config.PORT})")
+            application.run_webhook(
+                listen="0.0.0.0",
+                port=Config.PORT,
+                url_path=Config.BOT_TOKEN,
+                webhook_url=f"{Config.WEBHOOK_URL.rstrip('/')}/{Config.BOT_TOKEN}",
+                allowed_updates=["message", "callback_query"]
+            )
+        else:
+            application.run_polling(allowed_updates=["message", "callback_query"])
         
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
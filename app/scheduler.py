@@ -1,7 +1,11 @@
 """Scheduler for daily exam reminders."""
 
+import asyncio
 import logging
+from collections import defaultdict
 from datetime import time, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List
 from telegram.ext import ContextTypes, Application
 import pytz
 try:
@@ -14,25 +18,84 @@ from app.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Cap on concurrent sends when a shared job fans out to its members, so
+# a large group doesn't trip Telegram's global rate limit
+_GROUP_SEND_CONCURRENCY = 30
+
+# user_id -> the member list of the shared daily job the user currently
+# belongs to. Shared jobs keep a live reference to this list as job.data,
+# so removing a user here takes effect on the group's next fire.
+_group_membership: Dict[int, List[int]] = {}
+
+
+def _leave_group(user_id: int) -> None:
+    """Drop a user from their shared daily job, if they are in one."""
+    members = _group_membership.pop(user_id, None)
+    if members is not None:
+        try:
+            members.remove(user_id)
+        except ValueError:
+            pass
+
 
 async def send_daily_reminder(context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Send daily reminder to a user."""
-    user_id = context.job.data
-    
+    """Send daily reminder to a user (individual per-user job)."""
+    await _send_reminder_to(context, context.job.data)
+
+
+async def send_group_reminder(context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Send daily reminders to every member of a shared job concurrently."""
+    # Snapshot so members leaving mid-flight don't mutate the iteration
+    user_ids = list(context.job.data)
+    if not user_ids:
+        return
+
+    # Two IN (...) queries for the whole group instead of a round-trip
+    # pair per member; the sends below only do Telegram I/O
+    users, exams_by_user = await asyncio.gather(
+        db.run_db(db.get_users_bulk, user_ids),
+        db.run_db(db.get_exams_bulk, user_ids),
+    )
+
+    semaphore = asyncio.Semaphore(_GROUP_SEND_CONCURRENCY)
+
+    async def _one(uid: int) -> None:
+        async with semaphore:
+            user = users.get(uid)
+            if user is None:
+                # Row vanished since scheduling; the per-user path
+                # recreates it with defaults
+                await _send_reminder_to(context, uid)
+                return
+            await _deliver_reminder(context, user, exams_by_user.get(uid, []))
+
+    await asyncio.gather(*(_one(uid) for uid in user_ids))
+
+
+async def _send_reminder_to(context: ContextTypes.DEFAULT_TYPE, user_id: int) -> None:
+    """Fetch one user's data and send their daily reminder."""
+    try:
+        # One combined round-trip (off the event loop) instead of separate
+        # user and exam fetches
+        user, exams = await db.run_db(db.get_user_with_exams, user_id)
+    except Exception as e:
+        logger.error(f"Error sending daily reminder to user {user_id}: {e}", exc_info=True)
+        return
+
+    await _deliver_reminder(context, user, exams)
+
+
+async def _deliver_reminder(context: ContextTypes.DEFAULT_TYPE, user: dict, exams: list) -> None:
+    """Build and send one user's daily reminder from already-fetched data."""
+    user_id = user['user_id']
     logger.info(f"Running daily reminder job for user {user_id}")
-    
+
     try:
-        # Get user info
-        user = db.get_or_create_user(user_id)
-        
-        # Get user's exams
-        exams = db.get_user_exams(user_id)
-        
         logger.info(f"User {user_id} has {len(exams)} exams")
-        
+
         # Generate message
         message = get_upcoming_exams_message(exams, user['timezone'])
-        
+
         if message:
             await context.bot.send_message(
                 chat_id=user_id,
@@ -46,7 +109,7 @@ async def send_daily_reminder(context: ContextTypes.DEFAULT_TYPE) -> None:
                 text="📭 No upcoming exams to remind you about!\n\nUse ➕ Add Exam to add your exams."
             )
             logger.info(f"No upcoming exams for user {user_id}, sent empty notification")
-    
+
     except Exception as e:
         logger.error(f"Error sending daily reminder to user {user_id}: {e}", exc_info=True)
 
@@ -67,27 +130,54 @@ def schedule_user_reminder(application: Application, user_id: int, notify_time_s
     if job_queue is None:
         logger.error("Job queue is not available; skipping scheduling for user %s", user_id)
         return
-    
+
+    # A user rescheduling individually no longer matches their old
+    # group's time, so pull them out of the shared job first
+    _leave_group(user_id)
+
     # Remove existing job if present
     current_jobs = job_queue.get_jobs_by_name(job_name)
     for job in current_jobs:
         logger.info(f"Removing existing job for user {user_id}")
         job.schedule_removal()
-    
-    # Parse time
-    hour, minute = map(int, notify_time_str.split(':'))
-    
-    # Use ZoneInfo for proper timezone handling with datetime.time
-    # ZoneInfo works correctly with datetime.time unlike pytz
+
+    _add_user_job(job_queue, user_id, notify_time_str, timezone_str)
+
+
+@lru_cache(maxsize=512)
+def _zi(name: str):
+    """Resolve a timezone name to a ZoneInfo, cached per distinct name.
+
+    Timezones are stored canonicalized at input time, so ZoneInfo (which
+    works correctly with datetime.time, unlike pytz) resolves them
+    directly; the pytz fallback only runs for legacy rows saved before
+    canonicalization, and only on a cache miss.
+    """
     try:
-        tz = ZoneInfo(timezone_str)
+        return ZoneInfo(name)
     except Exception:
-        # Fallback to pytz if ZoneInfo fails
-        tz = pytz.timezone(timezone_str)
-    
-    # Create time with timezone info
-    notify_time = time(hour=hour, minute=minute, tzinfo=tz)
-    
+        return pytz.timezone(name)
+
+
+@lru_cache(maxsize=1024)
+def _parse_schedule(notify_time_str: str, timezone_str: str) -> time:
+    """Parse a user's notify time and timezone into an aware time object.
+
+    Users cluster on a handful of times and zones, so caching the parsed
+    result means the split, int conversion and tzdata load happen once
+    per distinct (time, timezone) pair rather than once per user at
+    startup.
+    """
+    hour, minute = map(int, notify_time_str.split(':'))
+    return time(hour=hour, minute=minute, tzinfo=_zi(timezone_str))
+
+
+def _add_user_job(job_queue, user_id: int, notify_time_str: str, timezone_str: str) -> None:
+    """Register the daily reminder job for one user (no removal scan)."""
+    job_name = f"daily:{user_id}"
+
+    notify_time = _parse_schedule(notify_time_str, timezone_str)
+
     logger.info(f"Scheduling reminder for user {user_id}: time={notify_time_str}, tz={timezone_str}, notify_time={notify_time}")
     
     # Schedule job
@@ -123,46 +213,93 @@ def schedule_user_reminder(application: Application, user_id: int, notify_time_s
             logger.info(f"Scheduled daily reminder for user {user_id} at {notify_time_str} {timezone_str}")
 
 
-def reschedule_user_reminder(application: Application, user_id: int) -> None:
-    """Reschedule reminder for a user (re-read from DB)."""
-    user = db.get_or_create_user(user_id)
-    schedule_user_reminder(
-        application,
-        user_id,
-        user['notify_time'],
-        user['timezone']
-    )
-
-
-def ensure_user_scheduled(application: Application, user_id: int) -> bool:
+def ensure_user_scheduled(application: Application, user_id: int,
+                          notify_time_str: str, timezone_str: str) -> bool:
     """
     Check if user has a scheduled job, and create one if not.
     Returns True if job exists or was created, False if failed.
+
+    Callers pass the user's schedule from the row they already hold, so
+    the check never touches the database from the event loop.
     """
     job_queue = application.job_queue
     if job_queue is None:
         return False
-    
+
+    # Users covered by a shared daily job have no per-user job
+    if user_id in _group_membership:
+        return True
+
     job_name = f"daily:{user_id}"
     jobs = job_queue.get_jobs_by_name(job_name)
-    
+
     if not jobs:
         # No job exists, create one
         logger.info(f"No job found for user {user_id}, creating one...")
-        reschedule_user_reminder(application, user_id)
+        schedule_user_reminder(application, user_id, notify_time_str, timezone_str)
         return True
-    
+
     return True
 
 
 def schedule_all_users(application: Application) -> None:
     """Schedule reminders for all users in the database."""
-    users = db.get_all_users()
-    for user in users:
-        schedule_user_reminder(
-            application,
-            user['user_id'],
-            user['notify_time'],
-            user['timezone']
-        )
-    logger.info(f"Scheduled reminders for {len(users)} users")
+    job_queue = application.job_queue
+    if job_queue is None:
+        logger.error("Job queue is not available; skipping startup scheduling")
+        return
+
+    # Snapshot existing daily jobs once: get_jobs_by_name walks the whole
+    # queue, so calling it per user would make startup O(users x jobs)
+    existing = {
+        job.name: job
+        for job in job_queue.jobs()
+        if job.name and job.name.startswith(("daily:", "dailygroup:"))
+    }
+
+    # Users cluster on popular notify times, so one shared job per
+    # (time, timezone) pair replaces a job-queue entry per user; the
+    # shared job fans sends out concurrently under a semaphore
+    groups: Dict[tuple, List[int]] = defaultdict(list)
+    total_users = 0
+    # Stream users in pages rather than materializing the whole table;
+    # only the compact group map stays in memory
+    for chunk in db.iter_all_users():
+        for user in chunk:
+            groups[(user['notify_time'], user['timezone'])].append(user['user_id'])
+            total_users += 1
+
+    for (notify_time_str, timezone_str), member_ids in groups.items():
+        job_name = f"dailygroup:{notify_time_str}:{timezone_str}"
+        stale = existing.pop(job_name, None)
+        if stale is not None:
+            stale.schedule_removal()
+
+        if Config.DEBUG_FAST_SCHEDULE:
+            # For testing: run every 60 seconds
+            job_queue.run_repeating(
+                send_group_reminder,
+                interval=60,
+                first=5,
+                data=member_ids,
+                name=job_name
+            )
+        else:
+            job_queue.run_daily(
+                send_group_reminder,
+                time=_parse_schedule(notify_time_str, timezone_str),
+                days=(0, 1, 2, 3, 4, 5, 6),  # All days
+                data=member_ids,
+                name=job_name
+            )
+
+        for uid in member_ids:
+            _group_membership[uid] = member_ids
+
+    # Anything left over is a stale per-user or group job with no users
+    for job in existing.values():
+        job.schedule_removal()
+
+    logger.info(
+        f"Scheduled {len(groups)} shared reminder jobs covering {total_users} users"
+    )
@@ -1,11 +1,25 @@
 """Utility functions for date parsing and formatting."""
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Tuple
 import pytz
 import re
 
 
+@lru_cache(maxsize=256)
+def _get_zone(tz_str: str):
+    """Resolve an IANA timezone once; repeat lookups are cache hits."""
+    return pytz.timezone(tz_str)
+
+
+# Input-validation patterns compiled once at import; per-call re.match
+# would pay the pattern-cache lookup on every add/edit/settime
+_RE_DATETIME = re.compile(r'(\d{4})-(\d{2})-(\d{2})\s+(\d{2}):(\d{2})$')
+_RE_DATE = re.compile(r'(\d{4})-(\d{2})-(\d{2})$')
+_RE_TIME = re.compile(r'^(\d{1,2}):(\d{2})$')
+
+
 def parse_exam_datetime(date_str: str, default_time: str = "09:00") -> Optional[str]:
     """
     Parse exam date/time string and return ISO format.
@@ -19,8 +33,7 @@ def parse_exam_datetime(date_str: str, default_time: str = "09:00") -> Optional[
     date_str = date_str.strip()
     
     # Try YYYY-MM-DD HH:MM format
-    pattern_with_time = r'(\d{4})-(\d{2})-(\d{2})\s+(\d{2}):(\d{2})'
-    match = re.match(pattern_with_time, date_str)
+    match = _RE_DATETIME.match(date_str)
     if match:
         try:
             dt = datetime(
@@ -35,8 +48,7 @@ def parse_exam_datetime(date_str: str, default_time: str = "09:00") -> Optional[
             return None
     
     # Try YYYY-MM-DD format (add default time)
-    pattern_date_only = r'(\d{4})-(\d{2})-(\d{2})$'
-    match = re.match(pattern_date_only, date_str)
+    match = _RE_DATE.match(date_str)
     if match:
         try:
             hour, minute = map(int, default_time.split(':'))
@@ -60,9 +72,8 @@ def parse_time(time_str: str) -> Optional[str]:
     Returns normalized HH:MM string or None if invalid.
     """
     time_str = time_str.strip()
-    pattern = r'^(\d{1,2}):(\d{2})$'
-    match = re.match(pattern, time_str)
-    
+    match = _RE_TIME.match(time_str)
+
     if match:
         try:
             hour = int(match.group(1))
@@ -75,35 +86,74 @@ def parse_time(time_str: str) -> Optional[str]:
     return None
 
 
+# All IANA names pytz knows, frozen once so the common exact-name case
+# is a hash lookup with no tzfile read or exception handling
+_TZ_NAMES = frozenset(pytz.all_timezones_set)
+
+
+@lru_cache(maxsize=256)
 def validate_timezone(tz_str: str) -> bool:
     """Check if timezone string is valid IANA timezone."""
+    if tz_str in _TZ_NAMES:
+        return True
+    # Fall back to pytz's (case-insensitive) lookup so inputs like
+    # "europe/rome" keep validating as before
     try:
-        pytz.timezone(tz_str)
+        _get_zone(tz_str)
         return True
     except pytz.exceptions.UnknownTimeZoneError:
         return False
 
 
-def format_exam_countdown(exam_datetime_iso: str, user_timezone: str) -> Tuple[str, int]:
+@lru_cache(maxsize=256)
+def canonical_timezone(tz_str: str) -> Optional[str]:
+    """Return the canonical IANA name for a timezone, or None if invalid.
+
+    Storing the canonical name at input time means later consumers
+    (scheduler, formatting) can resolve it with ZoneInfo directly instead
+    of re-running pytz's case-insensitive lookup.
     """
-    Calculate days until exam and format countdown message.
-    
-    Returns:
-        Tuple of (formatted_message, days_until)
-        e.g., ("5 days left", 5) or ("today", 0) or ("tomorrow", 1)
+    if tz_str in _TZ_NAMES:
+        return tz_str
+    try:
+        return _get_zone(tz_str).zone
+    except pytz.exceptions.UnknownTimeZoneError:
+        return None
+
+
+def iso_display(exam_datetime_iso: str) -> str:
+    """Format an ISO datetime string for display (T separator -> space).
+
+    The separator is always at index 10 for the stored format, so slicing
+    beats scanning the whole string with str.replace.
+    """
+    return exam_datetime_iso[:10] + ' ' + exam_datetime_iso[11:]
+
+
+def user_today(user_timezone: str) -> date:
+    """Return today's date in the user's timezone."""
+    return datetime.now(_get_zone(user_timezone)).date()
+
+
+@lru_cache(maxsize=4096)
+def _countdown_for(exam_datetime_iso: str, today: date) -> Tuple[str, int]:
+    """Compute the countdown for one exam/date pair.
+
+    The result is constant for a given day, so repeat renders of the same
+    exam (list refreshes, daily reminders) skip the datetime parse and
+    arithmetic entirely; stale days age out of the LRU on their own.
     """
-    exam_dt = datetime.fromisoformat(exam_datetime_iso)
-    
-    # Get current time in user's timezone
-    tz = pytz.timezone(user_timezone)
-    now = datetime.now(tz).replace(tzinfo=None)
-    
     # Calculate difference based on DATE only, not time
     # This fixes the issue where an exam later today shows as "passed"
-    exam_date = exam_dt.date()
-    today_date = now.date()
-    days = (exam_date - today_date).days
-    
+    # The stored format is fixed-width, so slicing out YYYY-MM-DD avoids
+    # a full datetime parse when only the date matters
+    exam_date = date(
+        int(exam_datetime_iso[0:4]),
+        int(exam_datetime_iso[5:7]),
+        int(exam_datetime_iso[8:10])
+    )
+    days = exam_date.toordinal() - today.toordinal()
+
     if days < 0:
         return "passed", days
     elif days == 0:
@@ -114,25 +164,56 @@ def format_exam_countdown(exam_datetime_iso: str, user_timezone: str) -> Tuple[s
         return f"{days} days left", days
 
 
-def get_upcoming_exams_message(exams: list, user_timezone: str) -> Optional[str]:
+def format_exam_countdown(exam_datetime_iso: str, user_timezone: str,
+                          today: Optional[date] = None) -> Tuple[str, int]:
     """
-    Generate daily notification message for upcoming exams.
-    Returns None if no upcoming exams.
+    Calculate days until exam and format countdown message.
+
+    Callers rendering several exams should compute `today` once via
+    user_today() and pass it in, so the timezone lookup and clock read
+    happen once per list instead of once per exam.
+
+    Returns:
+        Tuple of (formatted_message, days_until)
+        e.g., ("5 days left", 5) or ("today", 0) or ("tomorrow", 1)
+    """
+    if today is None:
+        # Get current date in user's timezone
+        today = user_today(user_timezone)
+
+    return _countdown_for(exam_datetime_iso, today)
+
+
+@lru_cache(maxsize=2048)
+def _render_reminder(exam_key: Tuple[Tuple[str, str], ...], user_timezone: str,
+                     today: date) -> Optional[str]:
+    """Render the reminder text for one (exam set, timezone, day) triple.
+
+    The message only changes when an exam changes or the day rolls over,
+    so repeat fires for the same state (DEBUG_FAST_SCHEDULE loops every
+    60s, list refreshes) return the cached string instead of
+    re-formatting every line.
     """
-    if not exams:
-        return None
-    
     upcoming = []
-    for exam in exams:
-        countdown_msg, days = format_exam_countdown(
-            exam['exam_datetime_iso'],
-            user_timezone
-        )
+    for exam_iso, title in exam_key:
+        countdown_msg, days = _countdown_for(exam_iso, today)
         # Only include future exams or today
         if days >= 0:
-            upcoming.append(f"- {exam['title']} — {countdown_msg}")
-    
+            upcoming.append(f"- {title} — {countdown_msg}")
+
     if not upcoming:
         return None
-    
+
     return "📚 Exam reminder:\n" + "\n".join(upcoming)
+
+
+def get_upcoming_exams_message(exams: list, user_timezone: str) -> Optional[str]:
+    """
+    Generate daily notification message for upcoming exams.
+    Returns None if no upcoming exams.
+    """
+    if not exams:
+        return None
+
+    exam_key = tuple((e['exam_datetime_iso'], e['title']) for e in exams)
+    return _render_reminder(exam_key, user_timezone, user_today(user_timezone))
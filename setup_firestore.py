@@ -11,11 +11,13 @@ import sys
 def firebase_json_to_heroku_string(json_file: str) -> str:
     """Convert Firebase JSON key file to single-line Heroku config string."""
     try:
-        with open(json_file, 'r') as f:
-            creds = json.load(f)
-        
-        # Return as single-line JSON
-        return json.dumps(creds)
+        # Binary read skips text-mode decoding; json handles the encoding
+        with open(json_file, 'rb') as f:
+            creds = json.loads(f.read())
+
+        # Return as single-line JSON; compact separators keep the Heroku
+        # config var as small as possible
+        return json.dumps(creds, separators=(',', ':'))
     except FileNotFoundError:
         print(f"Error: File {json_file} not found")
         sys.exit(1)